@@ -0,0 +1,144 @@
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+import journal
+from case_store import NON_LABEL_COLUMNS, blank, store
+from data import save_dataframe
+
+TEXT_COLUMNS = ("Notes", "Judge Notes")
+TRUE_VALUES = {"1", "true", "yes", "y", "x"}
+FALSE_VALUES = {"0", "false", "no", "n"}
+
+
+def read_updates(path):
+    """Read a CSV or JSONL file of case updates as an object-dtype frame.
+
+    Blank cells (and missing JSON keys or nulls) mean "leave unchanged".
+    """
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        updates = pd.read_json(path, lines=True, dtype=False)
+    else:
+        updates = pd.read_csv(path, dtype=str, keep_default_na=False)
+    if "Case ID" not in updates.columns:
+        raise ValueError(f"{path} has no 'Case ID' column")
+    return updates.astype(object)
+
+
+def tick_value(value):
+    """Label/Case Done cell as save_case writes it: 1, "" or None (unchanged)."""
+    if blank(value):
+        return None
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES or text == "1.0":
+        return 1
+    if text in FALSE_VALUES or text == "0.0":
+        return ""
+    raise ValueError(f"not a checkbox value: {value!r}")
+
+
+def text_value(value):
+    """Notes cell as save_case writes it (stripped), or None (unchanged)."""
+    if blank(value):
+        return None
+    return str(value).strip()
+
+
+def apply_updates(frame, updates, schema):
+    """Apply updates to frame in place, one assignment per column.
+
+    Returns (changed cells per column, Case IDs that were not found, number
+    of update rows applied). When a Case ID repeats only its last row is
+    applied.
+    Columns other than Case ID must be a label in schema, Notes, Judge Notes
+    or Case Done.
+    """
+    unknown = [
+        col
+        for col in updates.columns
+        if col not in schema and col not in NON_LABEL_COLUMNS
+    ]
+    if unknown:
+        raise ValueError(f"not label columns of this workbook: {', '.join(unknown)}")
+
+    # Case IDs may be read as text (CSV) or numbers (JSONL)
+    positions = {str(case_id): pos for case_id, pos in store.index.items()}
+    keys = updates["Case ID"].map(lambda case_id: str(case_id).strip())
+    rows = keys.map(positions)
+    missing = updates.loc[rows.isna(), "Case ID"].tolist()
+    found = rows.notna() & ~keys.duplicated(keep="last")
+    updates, rows = updates[found], rows[found].astype(int).to_numpy()
+
+    changed = {}
+    for col in updates.columns:
+        if col == "Case ID":
+            continue
+        convert = text_value if col in TEXT_COLUMNS else tick_value
+        values = updates[col].map(convert)
+        given = values.notna().to_numpy()
+        if not given.any():
+            continue
+        if col not in frame.columns:
+            frame[col] = pd.Series("", index=frame.index, dtype=object)
+        loc = frame.columns.get_loc(col)
+        target = rows[given]
+        new = values.to_numpy(dtype=object)[given]
+        old = frame.iloc[target, loc].to_numpy(dtype=object)
+        differs = np.array(
+            [not (blank(a) and blank(b)) and a != b for a, b in zip(old, new)],
+            dtype=bool,
+        )
+        if differs.any():
+            frame.iloc[target[differs], loc] = new[differs]
+            changed[col] = int(differs.sum())
+    return changed, missing, len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Apply labels, notes and Case Done to many cases at once. "
+        "Close the review app first: it keeps its own copy of the workbook."
+    )
+    parser.add_argument("updates", help="CSV or JSONL file with a Case ID column")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="report changes without saving"
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="fail if any Case ID is not in the workbook",
+    )
+    args = parser.parse_args(argv)
+
+    updates = read_updates(args.updates)
+    store.load()
+    frame = store.frame()
+    try:
+        changed, missing, applied = apply_updates(frame, updates, store.schema)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if missing:
+        print(f"{len(missing)} Case ID(s) not found: {missing[:10]}", file=sys.stderr)
+        if args.strict:
+            return 1
+
+    total = sum(changed.values())
+    for col, count in changed.items():
+        print(f"{col}: {count} cell(s) changed")
+    if args.dry_run or not total:
+        print(f"{total} cell(s) would change." if args.dry_run else "Nothing changed.")
+        return 0
+
+    # The frame already includes journaled edits, so one rewrite covers them
+    seq = journal.last_seq()
+    save_dataframe(frame)
+    journal.truncate_through(seq)
+    print(f"Saved {total} cell change(s) across {applied} update row(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
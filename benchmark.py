@@ -0,0 +1,270 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from openpyxl import Workbook
+
+import create_excels
+import journal
+from case_store import STATUS_CATEGORIES, CaseStore, store
+from data import (
+    cache_paths,
+    load_dataframe,
+    read_workbook_streaming,
+    save_dataframe,
+    save_rows,
+)
+from file_index import file_index
+from prefetch import prepare_case
+from ui_functions import get_progress_message
+
+
+def make_cases_dataframe(rows, labels):
+    """Build a synthetic cases sheet with roughly a third of labels ticked."""
+    data = {"Case ID": range(1, rows + 1)}
+    for j in range(labels):
+        data[f"Label {j}"] = [1 if (i + j) % 3 == 0 else "" for i in range(rows)]
+    data["Notes"] = [f"Note for case {i}" if i % 5 == 0 else "" for i in range(rows)]
+    data["Judge Notes"] = ""
+    data["Case Done"] = [1 if i % 2 == 0 else "" for i in range(rows)]
+    return pd.DataFrame(data)
+
+
+def write_workbook(df, path):
+    """Stream df into an .xlsx with openpyxl's write-only mode (fast for big sheets)."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(list(df.columns))
+    for row in df.itertuples(index=False, name=None):
+        sheet.append([None if value == "" else value for value in row])
+    workbook.save(path)
+
+
+def make_case_files(case_ids, pdf_folder, txt_folder, missing_every=10):
+    """A PDF and TXT per case, leaving every missing_every-th case without them."""
+    os.makedirs(pdf_folder, exist_ok=True)
+    os.makedirs(txt_folder, exist_ok=True)
+    for n, case_id in enumerate(case_ids):
+        if n % missing_every == missing_every - 1:
+            continue
+        with open(os.path.join(pdf_folder, f"{case_id}.pdf"), "wb") as f:
+            f.write(b"%PDF-1.4\n" + b"0" * (512 * (1 + n % 7)))
+        with open(os.path.join(txt_folder, f"{case_id}.txt"), "w") as f:
+            f.write("".join(f"Case {case_id} line {i}\n" for i in range(1 + n % 50)))
+
+
+def mean_ms(func, items):
+    """Mean wall time of func(item) over items, in milliseconds."""
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - start) * 1000 / max(len(items), 1)
+
+
+def time_call(func, repeat):
+    """Best wall time of repeat calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench_save(sizes, labels, repeat):
+    """Compare a full workbook rewrite with a one-row delta save."""
+    print(f"{'rows':>8} {'full save (ms)':>16} {'delta save (ms)':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            path = os.path.join(tmp, f"cases_{rows}.xlsx")
+            df = make_cases_dataframe(rows, labels)
+            save_dataframe(df, path)
+            columns = [col for col in df.columns if col != "Case ID"]
+            pos = rows // 2
+            row = dict(zip(columns, df.iloc[pos][columns].tolist()))
+            row["Notes"] = "Edited during benchmark"
+
+            full_ms = time_call(lambda: save_dataframe(df, path), repeat)
+            delta_ms = time_call(lambda: save_rows({pos: row}, path), repeat)
+            print(f"{rows:>8} {full_ms:>16.1f} {delta_ms:>16.1f}")
+
+
+def bench_row_update(label_counts, rows, repeat):
+    """Compare the old per-column mask assignment with CaseStore.update_row."""
+    print(f"{'labels':>8} {'mask loop (ms)':>16} {'update_row (ms)':>16}")
+    for labels in label_counts:
+        df = make_cases_dataframe(rows, labels).astype(object)
+        store = CaseStore()
+        store.set_dataframe(df)
+        pos = rows // 2
+        case_id = store.case_ids[pos]
+        edits = [
+            {col: 1 if (j + k) % 2 else "" for j, col in enumerate(df.columns[1:])}
+            for k in range(2)
+        ]
+
+        def mask_loop():
+            for values in edits:
+                for col, value in values.items():
+                    df.loc[df["Case ID"] == case_id, col] = value
+
+        def update_row():
+            for values in edits:
+                store.update_row(pos, values)
+
+        loop_ms = time_call(mask_loop, repeat) / len(edits)
+        row_ms = time_call(update_row, repeat) / len(edits)
+        print(f"{labels:>8} {loop_ms:>16.2f} {row_ms:>16.3f}")
+
+
+def bench_suite(sizes, label_counts, repeat, parts=8, samples=200):
+    """Time the data path behind each UI action on generated workbooks.
+
+    Tk is not needed: load_case is timed as prepare_case (what it shows),
+    save_case as update_row plus the journal append, update_progress as its
+    counters and message, and view_open_cases as its category lists.
+    Returns one result dict per workbook size.
+    """
+    results = []
+    for rows in sizes:
+        for labels in label_counts:
+            tmp = tempfile.mkdtemp(prefix="eval-bench-")
+            try:
+                results.append(
+                    bench_workbook(tmp, rows, labels, repeat, parts, samples)
+                )
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+            print(json.dumps(results[-1]))
+    return results
+
+
+def bench_workbook(tmp, rows, labels, repeat, parts, samples):
+    result = {"rows": rows, "labels": labels}
+    path = os.path.join(tmp, "cases.xlsx")
+    pdf_folder = os.path.join(tmp, "pdfs")
+    txt_folder = os.path.join(tmp, "txts")
+
+    start = time.perf_counter()
+    df = make_cases_dataframe(rows, labels)
+    write_workbook(df, path)
+    make_case_files(df["Case ID"].tolist(), pdf_folder, txt_folder)
+    result["generate_s"] = round(time.perf_counter() - start, 2)
+
+    def cold_load():
+        for cache in cache_paths(path).values():
+            if os.path.exists(cache):
+                os.remove(cache)
+        return load_dataframe(path)
+
+    # A cold load parses the workbook and writes the sidecar cache once
+    result["load_dataframe_cold_ms"] = time_call(cold_load, 1)
+    result["load_dataframe_cached_ms"] = time_call(lambda: load_dataframe(path), repeat)
+
+    # Peak traced memory of each Excel parser next to the frame it returns
+    for name, read in (("stream", read_workbook_streaming), ("pandas", pd.read_excel)):
+        tracemalloc.start()
+        try:
+            frame = read(path)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        result[f"{name}_parse_peak_mib"] = round(peak / 2**20, 1)
+        result[f"{name}_frame_mib"] = round(
+            frame.memory_usage(deep=True).sum() / 2**20, 1
+        )
+
+    store.set_dataframe(load_dataframe(path))
+    file_index.set_folders(pdf_folder, txt_folder)
+    start = time.perf_counter()
+    file_index.refresh()
+    file_index.missing(store.case_ids)
+    result["file_index_scan_ms"] = (time.perf_counter() - start) * 1000
+
+    step = max(1, rows // samples)
+    positions = list(range(0, rows, step))[:samples]
+    result["load_case_ms"] = mean_ms(prepare_case, positions)
+
+    label = store.schema.labels[0]
+
+    def save(pos):
+        values = {label: "" if store.labels[pos, 0] else 1, "Notes": f"Saved {pos}"}
+        changed = store.update_row(pos, values)
+        journal.append(store.case_ids[pos], changed, path)
+
+    result["save_case_ms"] = mean_ms(save, positions)
+    journal.truncate_through(journal.last_seq(path), path)
+
+    def update_progress():
+        return (
+            store.done_count,
+            len(store),
+            file_index.missing(store.case_ids),
+            get_progress_message(),
+        )
+
+    result["update_progress_ms"] = time_call(update_progress, repeat)
+    result["view_open_cases_ms"] = time_call(
+        lambda: [store.cases_in(name) for name in STATUS_CATEGORIES], repeat
+    )
+
+    def shard():
+        found = create_excels.discover_files(pdf_folder, weight="size")
+        split = create_excels.split_balanced(found, parts)
+        columns = list(df.columns)
+        jobs = [
+            (names, columns, "Case ID", os.path.join(tmp, f"part_{i}.xlsx"))
+            for i, names in enumerate(split, 1)
+        ]
+        with ProcessPoolExecutor() as pool:
+            list(pool.map(create_excels.write_part, jobs))
+
+    result["shard_ms"] = time_call(shard, 1)
+    return {
+        key: round(value, 3) if isinstance(value, float) else value
+        for key, value in result.items()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluation Helper benchmarks")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 40000])
+    parser.add_argument("--labels", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--label-counts", type=int, nargs="+", default=[20, 100, 300])
+    parser.add_argument(
+        "--only",
+        choices=["save", "row-update", "suite"],
+        help="run a single benchmark",
+    )
+    parser.add_argument(
+        "--suite-rows", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    parser.add_argument("--suite-labels", type=int, nargs="+", default=[20, 100, 500])
+    parser.add_argument("--json", help="write the suite results to this file")
+    args = parser.parse_args()
+
+    if args.only == "suite":
+        report = {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "results": bench_suite(args.suite_rows, args.suite_labels, args.repeat),
+        }
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+        else:
+            print(json.dumps(report, indent=2))
+
+    if args.only in (None, "save"):
+        bench_save(args.rows, args.labels, args.repeat)
+    if args.only in (None, "row-update"):
+        bench_row_update(args.label_counts, max(args.rows), args.repeat)
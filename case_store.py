@@ -0,0 +1,347 @@
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+import journal
+from data import load_dataframe, read_preview
+
+# Case status categories shown by the View Open Cases popup
+STATUS_CATEGORIES = ("unreviewed", "open", "done", "ai_correct", "done_incorrect")
+
+# Every other column of the workbook that holds only 1 or blank cells is a
+# checkbox label; columns with other values (categories, scores) are kept as is
+NON_LABEL_COLUMNS = ("Case ID", "Notes", "Judge Notes", "Case Done")
+
+
+def blank(value):
+    return (
+        value is None
+        or (isinstance(value, str) and value == "")
+        or (isinstance(value, float) and math.isnan(value))
+    )
+
+
+def same_value(a, b):
+    """Cell equality where "", None and NaN all count as the same blank cell."""
+    if blank(a) or blank(b):
+        return blank(a) and blank(b)
+    return a == b
+
+
+def tick_column(series):
+    """True when every cell of series is 1, 0 (unticked) or blank."""
+    return bool((series.isna() | series.eq("") | series.eq(1) | series.eq(0)).all())
+
+
+def single_block(df):
+    """Copy df into one object-dtype block.
+
+    With mixed dtypes pandas splits a positional row assignment into one
+    write per column; a single block makes it one NumPy assignment.
+    """
+    return pd.DataFrame(
+        df.to_numpy(dtype=object), index=df.index, columns=df.columns, dtype=object
+    )
+
+
+class LabelSchema:
+    """The workbook's label columns and their positions in the label matrix.
+
+    Computed once per loaded workbook so every caller agrees on which
+    columns are checkboxes. When df is given, columns holding anything but
+    1, 0 or blank are left out (listed in excluded) so their values survive
+    the next full write.
+    """
+
+    def __init__(self, columns, df=None):
+        candidates = [col for col in columns if col not in NON_LABEL_COLUMNS]
+        self.excluded = []
+        if df is not None:
+            self.excluded = [col for col in candidates if not tick_column(df[col])]
+        self.labels = [col for col in candidates if col not in self.excluded]
+        self.position = {label: i for i, label in enumerate(self.labels)}
+
+    def add(self, label):
+        self.position[label] = len(self.labels)
+        self.labels.append(label)
+
+    def __contains__(self, col):
+        return col in self.position
+
+    def __iter__(self):
+        return iter(self.labels)
+
+    def __len__(self):
+        return len(self.labels)
+
+
+class CaseStore:
+    """Process-wide in-memory copy of the cases workbook.
+
+    The workbook is parsed once by load() and every UI path reads the same
+    data afterwards instead of calling load_dataframe() again. Label ticks
+    live in labels, a uint8 matrix of rows x schema labels, and df keeps the
+    remaining columns (Case ID, notes, Case Done). frame() joins them back
+    into the workbook's layout for saving.
+    """
+
+    def __init__(self):
+        self.df = None
+        self.labels = np.zeros((0, 0), dtype=np.uint8)
+        self.schema = LabelSchema([])
+        self.columns = []
+        self.case_ids = []
+        self.index = {}
+        # Running counts of cells equal to 1 per column ("Case Done" included)
+        self.counts = {}
+        # Row positions per status category, see STATUS_CATEGORIES
+        self.status = {name: set() for name in STATUS_CATEGORIES}
+        # Row positions saved to the journal but not yet compacted to Excel
+        self.dirty = set()
+        self.pending_edits = 0
+        # True once rows were patched into the workbook behind the cache's back
+        self.cache_stale = False
+        self.load_count = 0
+        self.load_seconds = 0.0
+        # True while only a preview of the workbook is loaded, see load_preview
+        self.loading = False
+
+    def load(self):
+        start = time.perf_counter()
+        self.set_dataframe(load_dataframe())
+        self.pending_edits = self.mark_journal_dirty()
+        self.load_seconds = time.perf_counter() - start
+        self.load_count += 1
+        print(
+            f"Loaded {len(self.df)} cases in {self.load_seconds:.2f}s "
+            f"(workbook parses: {self.load_count})"
+        )
+        return self.df
+
+    def load_preview(self, rows=50, case_id=None):
+        """Adopt the workbook's first rows (and case_id's) so the UI can start.
+
+        Until finish_loading() swaps in the full frame, positions only refer
+        to the preview: edits are journaled as usual, but nothing may be
+        written to the workbook from it.
+        """
+        start = time.perf_counter()
+        self.set_dataframe(read_preview(rows=rows, case_id=case_id))
+        self.loading = True
+        print(f"Previewed {len(self)} cases in {time.perf_counter() - start:.2f}s")
+
+    def read_full(self):
+        """Load the whole workbook without touching the store (any thread).
+
+        Returns (df, journal seq when the load started, seconds taken).
+        """
+        seq = journal.last_seq()
+        start = time.perf_counter()
+        df = load_dataframe()
+        return df, seq, time.perf_counter() - start
+
+    def finish_loading(self, df, seq, seconds):
+        """Replace the preview with a frame returned by read_full()."""
+        # Edits saved during the load may be missing from df
+        journal.replay(df, after_seq=seq)
+        self.set_dataframe(df)
+        self.pending_edits = self.mark_journal_dirty()
+        self.loading = False
+        self.load_seconds = seconds
+        self.load_count += 1
+        print(
+            f"Loaded {len(self.df)} cases in {seconds:.2f}s "
+            f"(workbook parses: {self.load_count})"
+        )
+
+    def set_dataframe(self, df):
+        """Adopt df as the case table and rebuild everything derived from it."""
+        self.columns = list(df.columns)
+        self.schema = LabelSchema(self.columns, df)
+        if self.schema.excluded:
+            print(
+                "Not shown as checkboxes (values other than 1, 0 or blank): "
+                + ", ".join(map(str, self.schema.excluded))
+            )
+        # Label cells hold 1 or blank, so one byte per cell is enough. Copy,
+        # as pandas may hand out a read-only view and ticks are written here.
+        self.labels = df[self.schema.labels].eq(1).to_numpy(dtype=np.uint8, copy=True)
+        self.df = single_block(df.drop(columns=self.schema.labels))
+        self.case_ids = df["Case ID"].tolist()
+        self.rebuild_index()
+        self.counts = dict(zip(self.schema.labels, self.labels.sum(axis=0).tolist()))
+        for col in self.df.columns:
+            if col != "Case ID":
+                self.counts[col] = int(self.df[col].eq(1).sum())
+        self.rebuild_status()
+        self.dirty = set()
+        self.pending_edits = 0
+
+    def frame(self):
+        """The full case table in workbook column order, labels as 1/""."""
+        ticks = np.full(self.labels.shape, "", dtype=object)
+        ticks[self.labels.astype(bool)] = 1
+        labels = pd.DataFrame(
+            ticks, index=self.df.index, columns=self.schema.labels, dtype=object
+        )
+        return pd.concat([self.df, labels], axis=1)[self.columns]
+
+    def label_column(self, label):
+        """Boolean tick mask of one label over all rows."""
+        return self.labels[:, self.schema.position[label]].astype(bool)
+
+    def cases_with(self, label):
+        """Case IDs whose label is ticked, in workbook order."""
+        return [self.case_ids[pos] for pos in np.flatnonzero(self.label_column(label))]
+
+    def rebuild_status(self):
+        """Classify every row into the status categories in one vectorized pass."""
+        df = self.df
+        done = df["Case Done"].eq(1).to_numpy(dtype=bool)
+        if "Is AI Correct" in self.schema:
+            ai_correct = self.label_column("Is AI Correct")
+        elif "Is AI Correct" in df.columns:
+            # Kept out of the labels because it holds other values
+            ai_correct = df["Is AI Correct"].eq(1).to_numpy(dtype=bool)
+        else:
+            ai_correct = np.zeros(len(df), dtype=bool)
+        any_ticked = self.labels.any(axis=1)
+        notes = df["Notes"]
+        no_notes = (notes.isna() | notes.eq("")).to_numpy(dtype=bool)
+        unreviewed = ~done & ~any_ticked & no_notes
+        masks = {
+            "unreviewed": unreviewed,
+            "open": ~done & ~unreviewed,
+            "done": done,
+            "ai_correct": ai_correct,
+            "done_incorrect": done & ~ai_correct,
+        }
+        self.status = {
+            name: set(np.flatnonzero(masks[name]).tolist())
+            for name in STATUS_CATEGORIES
+        }
+
+    def row_status(self, row):
+        """Status categories of one row given as {column: value}."""
+        done = row.get("Case Done") == 1
+        ai_correct = row.get("Is AI Correct") == 1
+        categories = set()
+        if done:
+            categories.add("done")
+            if not ai_correct:
+                categories.add("done_incorrect")
+        else:
+            ticked = any(value == 1 for col, value in row.items() if col in self.schema)
+            if ticked or not blank(row.get("Notes")):
+                categories.add("open")
+            else:
+                categories.add("unreviewed")
+        if ai_correct:
+            categories.add("ai_correct")
+        return categories
+
+    def cases_in(self, category):
+        """Case IDs of a status category in workbook order."""
+        return [self.case_ids[pos] for pos in sorted(self.status[category])]
+
+    def rebuild_index(self):
+        """Map every Case ID to its row position in df and case_ids.
+
+        Duplicate IDs resolve to their first row, as the old column scans did.
+        """
+        self.index = {}
+        for pos, case_id in enumerate(self.case_ids):
+            self.index.setdefault(case_id, pos)
+
+    def mark_journal_dirty(self):
+        """Mark rows with journaled edits as dirty; returns the entry count."""
+        entries = journal.read_entries()
+        self.dirty.update(
+            self.index[e["case_id"]] for e in entries if e["case_id"] in self.index
+        )
+        return len(entries)
+
+    def position_of(self, case_id):
+        """Row position of case_id, or None if it is not in the workbook."""
+        return self.index.get(case_id)
+
+    def row(self, pos):
+        """One case as {column: value} in workbook column order."""
+        values = dict(zip(self.df.columns, self.df.iloc[pos].tolist()))
+        ticks = self.labels[pos].tolist()
+        values.update(
+            (label, 1 if tick else "") for label, tick in zip(self.schema, ticks)
+        )
+        return {col: values[col] for col in self.columns}
+
+    def snapshot_rows(self, positions):
+        """Copy the given rows as {position: {column: value}} for saving."""
+        return {pos: self.row(pos) for pos in positions}
+
+    def add_column(self, col):
+        """Add an empty column, as a label unless it is a NON_LABEL_COLUMNS one."""
+        self.columns.append(col)
+        self.counts[col] = 0
+        if col in NON_LABEL_COLUMNS:
+            self.df[col] = ""
+            self.df = single_block(self.df)
+        else:
+            self.schema.add(col)
+            self.labels = np.hstack(
+                [self.labels, np.zeros((len(self.labels), 1), dtype=np.uint8)]
+            )
+
+    def update_row(self, pos, values):
+        """Write {column: value} into row pos.
+
+        Label ticks go into the label matrix and the other columns are set
+        with one positional assignment. Columns that do not exist yet are
+        added. Returns the fields whose value actually changed, which is what
+        gets journaled.
+        """
+        for col in values:
+            if col not in self.counts and col != "Case ID":
+                self.add_column(col)
+        current = self.row(pos)
+        changed = {
+            col: value
+            for col, value in values.items()
+            if not same_value(current[col], value)
+        }
+        if not changed:
+            return changed
+        others = {col: v for col, v in changed.items() if col not in self.schema}
+        if others:
+            locs = [self.df.columns.get_loc(col) for col in others]
+            self.df.iloc[pos, locs] = list(others.values())
+        for col, value in changed.items():
+            if col in self.schema:
+                self.labels[pos, self.schema.position[col]] = value == 1
+            self.counts[col] = (
+                self.counts.get(col, 0) + (value == 1) - (current.get(col) == 1)
+            )
+        before = self.row_status(current)
+        current.update(changed)
+        after = self.row_status(current)
+        for name in before - after:
+            self.status[name].discard(pos)
+        for name in after - before:
+            self.status[name].add(pos)
+        return changed
+
+    @property
+    def done_count(self):
+        return self.counts.get("Case Done", 0)
+
+    def ensure_loaded(self):
+        if self.df is None:
+            self.load()
+        return self.df
+
+    def __len__(self):
+        return len(self.case_ids)
+
+
+store = CaseStore()
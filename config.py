@@ -9,6 +9,16 @@ default_config = {
     "TXT_FOLDER": "./txts",
     "unsaved_warning": True,
     "default_theme": "clam",
+    "save_mode": "delta",
+    "compact_every": 50,
+    "storage_backend": "excel",
+    "SQLITE_PATH": "",
+    "prefetch_window": 5,
+    "file_poll_seconds": 10,
+    "timing_enabled": False,
+    "progressive_startup": True,
+    "last_case_id": None,
+    "excel_loader": "stream",
 }
 
 
@@ -27,6 +37,15 @@ def save_config(cfg):
         json.dump(cfg, f, indent=4)
 
 
+def sidecar_path(suffix, path=None):
+    """A file kept next to the workbook (EXCEL_PATH unless path is given).
+
+    The journal, search index and parsed-sheet cache all live there, so
+    they move and get cleaned up together with the workbook.
+    """
+    return (path or EXCEL_PATH) + suffix
+
+
 cfg = load_config()
 
 EXCEL_PATH = cfg.get("EXCEL_PATH", default_config["EXCEL_PATH"])
@@ -34,3 +53,24 @@ PDF_FOLDER = cfg.get("PDF_FOLDER", default_config["PDF_FOLDER"])
 TXT_FOLDER = cfg.get("TXT_FOLDER", default_config["TXT_FOLDER"])
 unsaved_warning = cfg.get("unsaved_warning", default_config["unsaved_warning"])
 default_theme = cfg.get("default_theme", default_config["default_theme"])
+save_mode = cfg.get("save_mode", default_config["save_mode"])
+compact_every = cfg.get("compact_every", default_config["compact_every"])
+# "excel" edits the workbook directly; "sqlite" keeps cases in SQLITE_PATH
+# (default: next to EXCEL_PATH) and uses the workbook for import/export only
+storage_backend = cfg.get("storage_backend", default_config["storage_backend"])
+SQLITE_PATH = cfg.get("SQLITE_PATH", default_config["SQLITE_PATH"])
+# Cases on either side of the current one prepared in the background
+prefetch_window = cfg.get("prefetch_window", default_config["prefetch_window"])
+# How often the PDF/TXT folders are checked for added or removed files
+file_poll_seconds = cfg.get("file_poll_seconds", default_config["file_poll_seconds"])
+# Record per-action latency spans (also enabled by EVAL_HELPER_TIMING=1)
+timing_enabled = cfg.get("timing_enabled", default_config["timing_enabled"])
+# Show the first cases while the rest of the workbook loads in the background
+progressive_startup = cfg.get(
+    "progressive_startup", default_config["progressive_startup"]
+)
+# Case shown at startup; remembered when the app closes
+last_case_id = cfg.get("last_case_id", default_config["last_case_id"])
+# "stream" parses the workbook row by row into compact columns; "pandas"
+# uses pd.read_excel, which holds the whole sheet in memory while parsing
+excel_loader = cfg.get("excel_loader", default_config["excel_loader"])
@@ -1,14 +1,53 @@
+import argparse
+import csv
+import glob
+import heapq
 import math
 import os
+import random
+import re
+from concurrent.futures import ProcessPoolExecutor
 
 import pandas as pd
+from openpyxl import Workbook
 
+from pdf_preview import page_count
 
-def get_txt_filenames(folder_path):
-    """Get all .txt filenames (without extension) in the given folder."""
-    return [
-        os.path.splitext(f)[0] for f in os.listdir(folder_path) if f.endswith(".pdf")
-    ]
+
+def get_txt_filenames(folder_path, extension=".pdf"):
+    """Get the names (without extension) of the folder's case files.
+
+    Despite the name this has always listed .pdf files, which is what the
+    case folders hold; pass extension=".txt" for transcript folders.
+    """
+    return [name for name, _ in discover_files(folder_path, extension)]
+
+
+def discover_files(folder_path, extension=".pdf", recursive=False, weight=None):
+    """Yield (name, weight) for each file ending in extension, as it is found.
+
+    Entries are streamed from os.scandir, so a folder with a million files
+    is never listed into memory at once. weight is None (every file counts
+    as 1), "size" (bytes, from the directory entry) or "path" (the full path,
+    for a later page count).
+    """
+    extension = extension.lower()
+    folders = [folder_path]
+    while folders:
+        with os.scandir(folders.pop()) as entries:
+            for entry in entries:
+                if recursive and entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+                    continue
+                name, ext = os.path.splitext(entry.name)
+                if ext.lower() != extension or not entry.is_file():
+                    continue
+                if weight == "size":
+                    yield name, entry.stat().st_size
+                elif weight == "path":
+                    yield name, entry.path
+                else:
+                    yield name, 1
 
 
 def split_list(lst, n):
@@ -17,40 +56,273 @@ def split_list(lst, n):
     return [lst[i * k + min(i, m) : (i + 1) * k + min(i + 1, m)] for i in range(n)]
 
 
+def split_balanced(items, n, seed=0):
+    """Split (name, weight) pairs into n parts of nearly equal total weight.
+
+    Greedy longest-processing-time packing: heaviest items first, each into
+    the currently lightest part. Equal weights are ordered by a shuffle with
+    the given seed, so the same folder and seed always give the same parts.
+    Each part is returned sorted by name.
+    """
+    items = list(items)
+    random.Random(seed).shuffle(items)
+    items.sort(key=lambda item: item[1], reverse=True)
+    # (total weight, item count, part): ties go to the part with fewer items
+    heap = [(0, 0, i) for i in range(n)]
+    parts = [[] for _ in range(n)]
+    for name, weight in items:
+        total, count, i = heapq.heappop(heap)
+        parts[i].append(name)
+        heapq.heappush(heap, (total + weight, count + 1, i))
+    return [sorted(part) for part in parts]
+
+
+class PartWriter:
+    """Streams rows into a part workbook (.xlsx or .csv) one name at a time.
+
+    .xlsx files use openpyxl's write-only mode, so memory stays constant
+    however many rows are written.
+    """
+
+    def __init__(self, output_path, columns, case_id_col):
+        self.output_path = output_path
+        self.csv = output_path.lower().endswith(".csv")
+        blank = "" if self.csv else None
+        self.row = [blank] * len(columns)
+        self.idx = columns.index(case_id_col) if case_id_col in columns else None
+        self.count = 0
+        if self.csv:
+            self.file = open(output_path, "w", newline="", encoding="utf-8")
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(columns)
+        else:
+            self.workbook = Workbook(write_only=True)
+            self.sheet = self.workbook.create_sheet()
+            self.sheet.append(columns)
+
+    def write(self, name):
+        row = self.row
+        if self.idx is not None:
+            row = list(row)
+            row[self.idx] = name
+        if self.csv:
+            self.writer.writerow(row)
+        else:
+            self.sheet.append(row)
+        self.count += 1
+
+    def close(self):
+        if self.csv:
+            self.file.close()
+        else:
+            self.workbook.save(self.output_path)
+
+
 def create_excel_from_filenames(filenames, columns, case_id_col, output_path):
-    """Create an Excel file with given filenames as Case ID."""
-    data = []
+    """Create an Excel (or .csv) file with given filenames as Case ID."""
+    writer = PartWriter(output_path, columns, case_id_col)
     for name in filenames:
-        row = ["" for _ in columns]
-        if case_id_col in columns:
-            idx = columns.index(case_id_col)
-            row[idx] = name
-        data.append(row)
-    df = pd.DataFrame(data, columns=columns)
-    df.to_excel(output_path, index=False)
+        writer.write(name)
+    writer.close()
+    return writer.count
 
 
-if __name__ == "__main__":
-    # --- User parameters ---
-    txt_folder = r"itr-3\human-verdicts"  # Change to your folder path
-    template_excel = "QA-merged.xlsx"
-    case_id_col = "Case ID"  # Change if your column is named differently
+def write_part(job):
+    """Worker-process entry point: job is (filenames, columns, case_id_col, path)."""
+    return create_excel_from_filenames(*job)
+
+
+def part_number(path):
+    """Sort key putting output_part_2 before output_part_10."""
+    numbers = re.findall(r"\d+", os.path.basename(path))
+    return (int(numbers[-1]) if numbers else math.inf, path)
+
+
+def read_part(path):
+    """Read one part workbook (runs in a worker process)."""
+    return pd.read_excel(path)
 
+
+def merge_parts(paths, columns, case_id_col, workers=None):
+    """Join part workbooks on case_id_col into one frame with the given columns.
+
+    A row counts as edited when any cell besides the Case ID is filled in.
+    Each case keeps its row from the first part (in paths order) where it
+    was edited, or its first row if it was never edited. Returns the merged
+    frame and a conflicts frame listing cases edited in more than one part
+    with the columns whose values disagree.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(read_part, paths))
+
+    frames = []
+    for number, (path, df) in enumerate(zip(paths, parts)):
+        if case_id_col not in df.columns:
+            raise KeyError(f"{path} has no {case_id_col!r} column")
+        df = df.assign(_part=number)
+        frames.append(df)
+    merged = pd.concat(frames, ignore_index=True, sort=False)
+    # Keep the template's columns first, then anything annotators added
+    extra = [c for c in merged.columns if c not in columns and c != "_part"]
+    columns = list(columns) + extra
+    for col in columns:
+        if col not in merged.columns:
+            merged[col] = ""
+    value_columns = [c for c in columns if c != case_id_col]
+    filled = merged[value_columns].notna() & merged[value_columns].ne("")
+    merged["_edited"] = filled.any(axis=1)
+    merged["_order"] = range(len(merged))
+
+    first_seen = merged.groupby(case_id_col, sort=False)["_order"].transform("min")
+    winners = (
+        merged.assign(_first=first_seen)
+        .sort_values(["_edited", "_part", "_order"], ascending=[False, True, True])
+        .drop_duplicates(case_id_col, keep="first")
+        .sort_values("_first")
+    )
+
+    edited = merged[merged["_edited"]]
+    edit_counts = edited.groupby(case_id_col, sort=False)["_part"].nunique()
+    conflict_ids = edit_counts.index[edit_counts > 1]
+    rows = []
+    if len(conflict_ids):
+        clashing = edited[edited[case_id_col].isin(conflict_ids)]
+        values = clashing[value_columns].mask(~filled.loc[clashing.index], "")
+        distinct = values.astype(str).groupby(clashing[case_id_col]).nunique()
+        part_lists = clashing.groupby(case_id_col)["_part"].unique()
+        for case_id in conflict_ids:
+            differing = distinct.columns[distinct.loc[case_id] > 1].tolist()
+            rows.append(
+                {
+                    case_id_col: case_id,
+                    "Parts": ", ".join(
+                        os.path.basename(paths[n]) for n in sorted(part_lists[case_id])
+                    ),
+                    "Differing Columns": ", ".join(map(str, differing)),
+                }
+            )
+    conflicts = pd.DataFrame(rows, columns=[case_id_col, "Parts", "Differing Columns"])
+    return winners[columns].reset_index(drop=True), conflicts
+
+
+def part_path(i, fmt):
+    return f"output_part_{i}.{fmt}"
+
+
+def split_command(args):
     # --- Load template columns ---
-    df_old = pd.read_excel(template_excel)
-    df_old_columns = df_old.columns.tolist()
+    df_old_columns = pd.read_excel(args.template, nrows=0).columns.tolist()
+
+    if args.shard == "stream":
+        # Round-robin while scanning: rows are written as files are found
+        writers = [
+            PartWriter(part_path(i, args.format), df_old_columns, args.case_id_col)
+            for i in range(1, args.parts + 1)
+        ]
+        found = discover_files(args.folder, args.extension, args.recursive)
+        for n, (name, _) in enumerate(found):
+            writers[n % args.parts].write(name)
+        for i, writer in enumerate(writers, 1):
+            writer.close()
+            print(f"Created {writer.output_path} with {writer.count} rows.")
+        return
 
     # --- Get filenames ---
-    filenames = get_txt_filenames(txt_folder)
-    if not filenames:
-        print("No .txt files found in the folder.")
+    if args.shard == "balanced":
+        weight = "path" if args.weight == "pages" else "size"
+        found = list(
+            discover_files(args.folder, args.extension, args.recursive, weight)
+        )
+        if args.weight == "pages":
+            with ProcessPoolExecutor(max_workers=args.workers) as pool:
+                pages = pool.map(page_count, [p for _, p in found], chunksize=256)
+                found = [(name, n) for (name, _), n in zip(found, pages)]
+    else:
+        found = list(discover_files(args.folder, args.extension, args.recursive))
+    if not found:
+        print(f"No {args.extension} files found in the folder.")
         exit(1)
 
     # --- Split filenames into n parts ---
-    split_filenames = split_list(filenames, 3)
+    if args.shard == "balanced":
+        split_filenames = split_balanced(found, args.parts, args.seed)
+    else:
+        split_filenames = split_list([name for name, _ in found], args.parts)
+
+    # --- Create the part files, one worker process per part ---
+    jobs = [
+        (part, df_old_columns, args.case_id_col, part_path(i, args.format))
+        for i, part in enumerate(split_filenames, 1)
+    ]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for (part, _, _, output_file), count in zip(jobs, pool.map(write_part, jobs)):
+            print(f"Created {output_file} with {count} rows.")
+
+
+def merge_command(args):
+    paths = sorted(
+        {path for pattern in args.parts for path in glob.glob(pattern)},
+        key=part_number,
+    )
+    if not paths:
+        print("No part workbooks matched.")
+        exit(1)
+    columns = pd.read_excel(args.template, nrows=0).columns.tolist()
+    merged, conflicts = merge_parts(paths, columns, args.case_id_col, args.workers)
+    merged.to_excel(args.output, index=False)
+    print(f"Merged {len(paths)} parts into {args.output} ({len(merged)} cases).")
+    if len(conflicts):
+        report = os.path.splitext(args.output)[0] + "_conflicts.csv"
+        conflicts.to_csv(report, index=False)
+        print(
+            f"{len(conflicts)} case(s) were edited in more than one part; "
+            f"the first part's edits were kept. See {report}."
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Split case files into annotation workbooks and merge them back."
+    )
+    parser.add_argument("--template", default="QA-merged.xlsx")
+    parser.add_argument("--case-id-col", default="Case ID")
+    commands = parser.add_subparsers(dest="command")
+
+    split_parser = commands.add_parser("split", help="create part workbooks")
+    split_parser.add_argument("--folder", default=r"itr-3\human-verdicts")
+    split_parser.add_argument("--parts", type=int, default=3)
+    split_parser.add_argument("--extension", default=".pdf")
+    split_parser.add_argument("--recursive", action="store_true")
+    split_parser.add_argument(
+        "--shard",
+        choices=["count", "balanced", "stream"],
+        default="count",
+        help="equal file counts, equal total work, or round-robin while scanning",
+    )
+    split_parser.add_argument(
+        "--weight",
+        choices=["size", "pages"],
+        default="size",
+        help="work measure for --shard balanced (pages needs PyMuPDF)",
+    )
+    split_parser.add_argument("--seed", type=int, default=0)
+    split_parser.add_argument("--format", choices=["xlsx", "csv"], default="xlsx")
+    split_parser.add_argument("--workers", type=int)
+
+    merge_parser = commands.add_parser("merge", help="merge part workbooks")
+    merge_parser.add_argument(
+        "parts", nargs="*", default=["output_part_*.xlsx"], help="paths or globs"
+    )
+    merge_parser.add_argument("--output", default="merged.xlsx")
+    merge_parser.add_argument(
+        "--workers", type=int, help="reader processes (default: CPU count)"
+    )
 
-    # --- Create Excel files ---
-    for i, part in enumerate(split_filenames, 1):
-        output_file = f"output_part_{i}.xlsx"
-        create_excel_from_filenames(part, df_old_columns, case_id_col, output_file)
-        print(f"Created {output_file} with {len(part)} rows.")
+    args = parser.parse_args()
+    if args.command == "merge":
+        merge_command(args)
+    else:
+        if args.command is None:
+            # Without a command, split with the defaults as before
+            args = parser.parse_args(["split"], namespace=args)
+        split_command(args)
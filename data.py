@@ -1,10 +1,157 @@
+import hashlib
+import json
+import os
+import tempfile
+import tracemalloc
+
+import numpy as np
 import pandas as pd
+from openpyxl import load_workbook
+
+import journal
+import sqlite_store
+import timing
+from config import (
+    EXCEL_PATH,
+    SQLITE_PATH,
+    excel_loader,
+    sidecar_path,
+    storage_backend,
+)
+from timing import timed
+from xlsx_patch import patch_rows
+
+
+def sqlite_path(path=None):
+    """SQLITE_PATH from config.json, or the workbook's name with .sqlite."""
+    if SQLITE_PATH and not path:
+        return SQLITE_PATH
+    return os.path.splitext(path or EXCEL_PATH)[0] + ".sqlite"
+
+
+STREAM_CHUNK_ROWS = 10000  # rows parsed before they are packed into columns
+
+
+def read_workbook(path):
+    if excel_loader != "stream":
+        return add_app_columns(pd.read_excel(path))
+    if not timing.enabled:
+        return read_workbook_streaming(path)
+    tracemalloc.start()
+    try:
+        df = read_workbook_streaming(path)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    size = df.memory_usage(deep=True).sum()
+    print(
+        f"Streamed {len(df)} rows: {size / 2**20:.1f} MiB frame, "
+        f"{peak / 2**20:.1f} MiB peak while parsing"
+    )
+    return df
+
+
+def read_workbook_streaming(path, chunk_rows=STREAM_CHUNK_ROWS):
+    """Parse the first sheet row by row into compact typed columns.
+
+    Only chunk_rows rows are held as Python tuples at a time; each chunk is
+    packed into one NumPy array per column, so label columns of 1/blank end
+    up as float64 (8 bytes a cell) instead of openpyxl cells or Python
+    objects. Peak memory stays around twice the final frame. Blank cells
+    and blank rows become NaN and trailing blank rows are dropped, as with
+    pd.read_excel, so row positions still match sheet rows.
+    """
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        values = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(values, ())
+        columns = sheet_columns(header)
+        width = len(columns)
+        chunks = [[] for _ in columns]
+        rows = []
+        for row in sheet_rows(values):
+            rows.append(row)
+            if len(rows) == chunk_rows:
+                pack_rows(rows, width, chunks)
+                rows = []
+        pack_rows(rows, width, chunks)
+    finally:
+        workbook.close()
+    data = {}
+    for col in columns:
+        # Join and free one column at a time to keep the peak low
+        data[col] = join_chunks(chunks.pop(0))
+    width = used_width(header, lambda i: pd.isna(data[columns[i]]).all())
+    for col in columns[width:]:
+        del data[col]
+    return add_app_columns(pd.DataFrame(data, columns=columns[:width], copy=False))
+
 
-from config import EXCEL_PATH
+def sheet_rows(values):
+    """Data rows of iter_rows(values_only=True) as pd.read_excel keeps them.
 
+    Blank rows are held back and only yielded (as empty tuples) once a row
+    with data follows, so blank rows after the last case are dropped.
+    """
+    blanks = 0
+    for row in values:
+        if all(value is None or value == "" for value in row):
+            blanks += 1
+            continue
+        for _ in range(blanks):
+            yield ()
+        blanks = 0
+        yield row
 
-def load_dataframe():
-    df = pd.read_excel(EXCEL_PATH)
+
+def pack_rows(rows, width, chunks):
+    """Append one typed array per column of rows to chunks."""
+    if not rows:
+        return
+    # Rows may be shorter than the header when their last cells are empty
+    padded = [(row + (None,) * width)[:width] for row in rows]
+    for i, cells in enumerate(zip(*padded)):
+        chunks[i].append(typed_array(cells))
+
+
+def typed_array(cells):
+    """cells as int64 or float64 when they are all numbers or blank, else object."""
+    numeric = True
+    blanks = False
+    for value in cells:
+        if value is None or (isinstance(value, str) and value == ""):
+            blanks = True
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            numeric = False
+            break
+    if numeric:
+        if not blanks:
+            try:
+                ints = all(isinstance(value, int) for value in cells)
+                return np.array(cells, dtype=np.int64 if ints else float)
+            except OverflowError:
+                pass
+        else:
+            return np.array(
+                [np.nan if value is None or value == "" else value for value in cells],
+                dtype=float,
+            )
+    array = np.empty(len(cells), dtype=object)
+    array[:] = [np.nan if value is None or value == "" else value for value in cells]
+    return array
+
+
+def join_chunks(arrays):
+    """Concatenate a column's chunks; mixed kinds fall back to object."""
+    if not arrays:
+        return np.empty(0, dtype=object)
+    if any(array.dtype == object for array in arrays):
+        arrays = [array.astype(object) for array in arrays]
+    return np.concatenate(arrays)
+
+
+def add_app_columns(df):
+    """Add the columns the app writes when the sheet does not have them yet."""
     if "Notes" not in df.columns:
         df["Notes"] = ""
     if "Case Done" not in df.columns:
@@ -12,5 +159,224 @@ def load_dataframe():
     return df
 
 
-def save_dataframe(df):
-    df.to_excel(EXCEL_PATH, index=False)
+def sheet_columns(header):
+    """Column names as pd.read_excel gives them for a header row."""
+    columns = []
+    for i, name in enumerate(header):
+        name = f"Unnamed: {i}" if name is None else name
+        # Repeated names get a .1, .2, ... suffix
+        base, count = name, 0
+        while name in columns:
+            count += 1
+            name = f"{base}.{count}"
+        columns.append(name)
+    return columns
+
+
+def used_width(header, column_blank):
+    """Number of columns pd.read_excel keeps for a header row.
+
+    Read-only iter_rows pads rows out to the sheet's dimension, so empty but
+    formatted cells after the last header show up as extra columns; trailing
+    columns without a header or any value (column_blank(i)) are dropped.
+    """
+    width = len(header)
+    while width and header[width - 1] is None and column_blank(width - 1):
+        width -= 1
+    return width
+
+
+PREVIEW_SCAN_ROWS = 5000  # rows read_preview looks through for case_id
+
+
+def read_preview(path=None, rows=50, case_id=None, scan_rows=PREVIEW_SCAN_ROWS):
+    """The workbook's first rows, plus case_id's row, from a streaming parse.
+
+    openpyxl's read-only mode parses the sheet row by row, so this returns
+    as soon as it has the first rows and has found case_id (when given)
+    instead of parsing the whole workbook. case_id is only looked for in
+    the first scan_rows rows, so a case that is not in the workbook does
+    not delay startup. Journaled edits are applied.
+    """
+    path = path or EXCEL_PATH
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        values = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(values, ())
+        columns = sheet_columns(header)
+        width = len(columns)
+        id_pos = columns.index("Case ID")
+        kept = []
+        found = case_id is None
+        # Same rows, and so the same positions, as the full loaders
+        for n, row in enumerate(sheet_rows(values)):
+            row = (tuple(row) + (None,) * width)[:width]
+            match = case_id is not None and row[id_pos] == case_id
+            if n < rows or match:
+                kept.append(row)
+                found = found or match
+            if n >= rows - 1 and (found or n >= scan_rows - 1):
+                break
+    finally:
+        workbook.close()
+    width = used_width(
+        header, lambda i: all(row[i] is None or row[i] == "" for row in kept)
+    )
+    kept = [row[:width] for row in kept]
+    df = pd.DataFrame(kept, columns=columns[:width], dtype=object)
+    df = add_app_columns(df)
+    return journal.replay(df, path)
+
+
+@timed("load_dataframe")
+def load_dataframe(path=None):
+    path = path or EXCEL_PATH
+    if storage_backend == "sqlite":
+        db_path = sqlite_path(path)
+        if not os.path.exists(db_path):
+            # First run on this project: import the workbook once
+            sqlite_store.write_frame(read_workbook(path), db_path)
+        df = sqlite_store.read_frame(db_path)
+    else:
+        df = load_cache(path)
+        if df is None:
+            df = read_workbook(path)
+            write_cache(df, path)
+    # Edits write 1/"" and free text into these columns, so keep them as
+    # object dtype rather than the string dtypes read_excel infers. Numeric
+    # (label) columns stay float64: the store packs them into its uint8
+    # matrix, and casting them would box every cell as a Python float.
+    editable = [
+        col
+        for col in df.columns
+        if col != "Case ID" and not pd.api.types.is_float_dtype(df[col])
+    ]
+    df[editable] = df[editable].astype(object)
+    # Edits saved after the last compaction only exist in the journal
+    return journal.replay(df, path)
+
+
+@timed("save_dataframe")
+def save_dataframe(df, path=None):
+    """Rewrite the whole store from df (compaction)."""
+    if storage_backend == "sqlite":
+        sqlite_store.write_frame(df, sqlite_path(path))
+    else:
+        export_excel(df, path)
+
+
+def export_excel(df, path=None):
+    """Write df to the workbook, replacing it atomically."""
+    path = path or EXCEL_PATH
+    fd, tmp_path = tempfile.mkstemp(
+        suffix=".xlsx", dir=os.path.dirname(os.path.abspath(path))
+    )
+    os.close(fd)
+    try:
+        df.to_excel(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    write_cache(df, path)
+
+
+@timed("save_rows")
+def save_rows(rows, path=None):
+    """Write only the given rows to the store.
+
+    rows maps a row position to a {column: value} dict that includes the
+    "Case ID". With the sqlite backend each row is a single UPDATE. With the
+    Excel backend the rows' cells are patched in the existing workbook; this
+    raises KeyError when a column is missing from the workbook header and
+    ValueError when the file cannot be patched, and the caller then falls back
+    to save_dataframe(). The sidecar cache goes stale (its fingerprint no
+    longer matches) until write_cache() is called with the up-to-date frame.
+    """
+    if storage_backend == "sqlite":
+        sqlite_store.update_rows(rows, sqlite_path(path))
+    else:
+        patch_rows(path or EXCEL_PATH, rows)
+
+
+# --- Sidecar cache ----------------------------------------------------------
+# Parsing .xlsx dominates startup, so a columnar copy of the sheet is kept
+# next to the workbook and reused while the workbook's fingerprint matches.
+
+
+def cache_paths(path):
+    return {
+        "meta": sidecar_path(".cache.json", path),
+        "parquet": sidecar_path(".cache.parquet", path),
+        "pickle": sidecar_path(".cache.pkl", path),
+    }
+
+
+def workbook_fingerprint(path):
+    """mtime, size and content hash identifying one version of the workbook."""
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": digest.hexdigest(),
+    }
+
+
+def cache_meta(path):
+    """The cache's metadata if its mtime and size still match path, else None."""
+    try:
+        with open(cache_paths(path)["meta"], "r") as f:
+            meta = json.load(f)
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    if meta.get("mtime_ns") != stat.st_mtime_ns or meta.get("size") != stat.st_size:
+        return None
+    return meta
+
+
+def load_cache(path):
+    """Return the cached frame for path, or None if it is missing or stale."""
+    paths = cache_paths(path)
+    meta = cache_meta(path)
+    if meta is None:
+        return None
+    if meta.get("sha256") != workbook_fingerprint(path)["sha256"]:
+        return None
+    try:
+        if meta.get("format") == "parquet":
+            return pd.read_parquet(paths["parquet"])
+        return pd.read_pickle(paths["pickle"])
+    except Exception:
+        # A damaged or unreadable cache is simply rebuilt from the workbook
+        return None
+
+
+def write_cache(df, path=None):
+    """Store df as the cached copy of the workbook as it is on disk now."""
+    path = path or EXCEL_PATH
+    paths = cache_paths(path)
+    try:
+        # Invalidate first so a crash half-way never pairs new meta with old data
+        if os.path.exists(paths["meta"]):
+            os.remove(paths["meta"])
+        try:
+            # Blank cells become nulls so 1/"" label columns stay typed
+            df.mask(df.eq("")).to_parquet(paths["parquet"], index=False)
+            fmt = "parquet"
+        except (ImportError, ValueError, TypeError):
+            # No pyarrow/fastparquet, or mixed-type columns parquet cannot hold
+            df.to_pickle(paths["pickle"])
+            fmt = "pickle"
+        meta = workbook_fingerprint(path)
+        meta["format"] = fmt
+        with open(paths["meta"], "w") as f:
+            json.dump(meta, f)
+    except OSError as e:
+        # The cache only speeds up startup; never fail a load or save over it
+        print(f"Could not write workbook cache for {path}: {e}")
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+
+from config import PDF_FOLDER, TXT_FOLDER, file_poll_seconds
+
+
+def scan_folder(folder, extension):
+    """Names (without extension) of the folder's files ending in extension."""
+    names = set()
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                if ext.lower() == extension and entry.is_file():
+                    names.add(stem)
+    except OSError:
+        # A missing or unreachable folder simply has no files
+        pass
+    return names
+
+
+def folder_mtime(folder):
+    try:
+        return os.stat(folder).st_mtime_ns
+    except OSError:
+        return None
+
+
+class FileIndex:
+    """Which cases have a PDF and a TXT file, from one directory listing each.
+
+    Listing a folder is one round trip even on a network mount, after which
+    every lookup is a set membership test. A daemon thread re-lists a folder
+    when its mtime changes (files added, removed or renamed), checking every
+    poll_seconds. version goes up with every rescan so the UI can tell when
+    to refresh counts.
+    """
+
+    def __init__(self, pdf_folder, txt_folder, poll_seconds=10):
+        self.poll_seconds = poll_seconds
+        self.version = 0
+        self._lock = threading.Lock()
+        self._folders = {}
+        self._names = {}
+        self._mtimes = {}
+        self._missing = None
+        self._thread = None
+        self.set_folders(pdf_folder, txt_folder)
+
+    def set_folders(self, pdf_folder, txt_folder):
+        with self._lock:
+            self._folders = {".pdf": pdf_folder, ".txt": txt_folder}
+            self._names = {}
+            self._mtimes = {}
+        if self._thread is not None:
+            # List the new folders now rather than at the next poll
+            threading.Thread(target=self.refresh, daemon=True).start()
+
+    def start(self):
+        """Build the index in the background and keep it fresh."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="file-index", daemon=True
+            )
+            self._thread.start()
+
+    def refresh(self):
+        """Re-list every folder whose mtime changed; True if anything did."""
+        changed = False
+        for extension, folder in list(self._folders.items()):
+            mtime = folder_mtime(folder)
+            if extension in self._names and mtime == self._mtimes.get(extension):
+                continue
+            names = scan_folder(folder, extension)
+            with self._lock:
+                if self._folders.get(extension) != folder:
+                    continue  # the folder was changed in Settings meanwhile
+                self._names[extension] = names
+                self._mtimes[extension] = mtime
+                self.version += 1
+            changed = True
+        return changed
+
+    def path(self, case_id, extension):
+        return os.path.join(self._folders[extension], f"{case_id}{extension}")
+
+    def has(self, case_id, extension):
+        """Whether {case_id}{extension} exists in its folder."""
+        names = self._names.get(extension)
+        if names is None:
+            # Not listed yet: fall back to asking the file system directly
+            return os.path.exists(self.path(case_id, extension))
+        return str(case_id) in names
+
+    def has_pdf(self, case_id):
+        return self.has(case_id, ".pdf")
+
+    def has_txt(self, case_id):
+        return self.has(case_id, ".txt")
+
+    def missing(self, case_ids):
+        """{"pdf": n, "txt": n} files missing for case_ids, or None before a scan."""
+        if len(self._names) < len(self._folders):
+            return None
+        key = (self.version, len(case_ids))
+        if self._missing is None or self._missing[0] != key:
+            ids = [str(case_id) for case_id in case_ids]
+            counts = {
+                ext[1:]: sum(1 for i in ids if i not in self._names[ext])
+                for ext in (".pdf", ".txt")
+            }
+            self._missing = (key, counts)
+        return self._missing[1]
+
+    def _run(self):
+        while True:
+            self.refresh()
+            time.sleep(self.poll_seconds)
+
+
+file_index = FileIndex(PDF_FOLDER, TXT_FOLDER, file_poll_seconds)
@@ -0,0 +1,129 @@
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from config import sidecar_path
+
+# Appends happen on the Tk thread and truncation on the writer thread
+_lock = threading.Lock()
+_last_seq = {}
+
+
+def journal_path(path=None):
+    return sidecar_path(".journal", path)
+
+
+def plain_value(value):
+    """Convert NumPy scalars and NaN into JSON-friendly Python values."""
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def last_seq(path=None):
+    """Sequence number of the newest journal entry (0 for an empty journal)."""
+    key = journal_path(path)
+    with _lock:
+        if key not in _last_seq:
+            _last_seq[key] = max(
+                (entry.get("seq", 0) for entry in read_entries(path)), default=0
+            )
+        return _last_seq[key]
+
+
+def append(case_id, fields, path=None):
+    """Durably record one case edit before the workbook is touched.
+
+    Returns the entry's sequence number.
+    """
+    seq = last_seq(path) + 1
+    entry = {
+        "seq": seq,
+        "case_id": plain_value(case_id),
+        "fields": {col: plain_value(value) for col, value in fields.items()},
+        "timestamp": time.time(),
+    }
+    line = (json.dumps(entry) + "\n").encode("utf-8")
+    with _lock:
+        with open(journal_path(path), "a+b") as f:
+            # Start on a fresh line if a crash left a torn entry at the end
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        _last_seq[journal_path(path)] = seq
+    return seq
+
+
+def read_entries(path=None):
+    """Return all journal entries, skipping a torn last line after a crash."""
+    entries = []
+    try:
+        with open(journal_path(path), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def replay(df, path=None, after_seq=0):
+    """Apply journal entries that were not compacted yet to df in place.
+
+    Only entries newer than after_seq are applied.
+    """
+    entries = [e for e in read_entries(path) if e.get("seq", 0) > after_seq]
+    if not entries:
+        return df
+    positions = {}
+    for pos, case_id in enumerate(df["Case ID"].tolist()):
+        positions.setdefault(case_id, pos)
+    for entry in entries:
+        pos = positions.get(entry["case_id"])
+        if pos is None:
+            continue
+        for col, value in entry["fields"].items():
+            if col not in df.columns:
+                df[col] = pd.Series("", index=df.index, dtype=object)
+            elif df[col].dtype != object:
+                # Numeric label columns cannot hold the "" of an unticked cell
+                df[col] = df[col].astype(object)
+            df.loc[df.index[pos], col] = "" if value is None else value
+    print(f"Replayed {len(entries)} journaled edit(s) from {journal_path(path)}")
+    return df
+
+
+def truncate_through(seq, path=None):
+    """Drop entries up to seq once they are safely in the workbook.
+
+    Entries appended after the writer took its snapshot are kept.
+    """
+    target = journal_path(path)
+    with _lock:
+        remaining = [e for e in read_entries(path) if e.get("seq", 0) > seq]
+        if not remaining:
+            try:
+                os.remove(target)
+            except FileNotFoundError:
+                pass
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(target)))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for entry in remaining:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, target)
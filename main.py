@@ -1,4 +1,14 @@
-from ui_elements import start_app
+import tkinter as tk
 
 if __name__ == "__main__":
-    start_app()
\ No newline at end of file
+    # Show a window before importing pandas and the workbook code, which
+    # takes a noticeable moment on a cold start
+    root = tk.Tk()
+    splash = tk.Label(root, text="Loading...", padx=40, pady=20)
+    splash.pack()
+    root.update()
+
+    from ui_elements import start_app
+
+    splash.destroy()
+    start_app(root)
@@ -0,0 +1,92 @@
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+# Lines longer than this are shown in pieces so one huge line cannot stall Tk
+MAX_LINE_BYTES = 4096
+
+
+class MappedText:
+    """Read-only memory map of a text file, read a window of lines at a time.
+
+    Positions are byte offsets, so nothing has to scan the whole file before
+    the first lines can be shown; only the lines asked for are decoded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        stat = os.stat(path)
+        self.signature = (stat.st_mtime_ns, stat.st_size)
+        self.size = stat.st_size
+        self.mm = None
+        if self.size:
+            with open(path, "rb") as f:
+                self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def line_start(self, offset):
+        """Offset of the start of the line containing offset."""
+        if not self.mm or offset <= 0:
+            return 0
+        offset = min(offset, self.size)
+        limit = max(0, offset - MAX_LINE_BYTES)
+        newline = self.mm.rfind(b"\n", limit, offset)
+        return newline + 1 if newline >= 0 else limit
+
+    def next_line(self, offset):
+        """Offset of the line after the one starting at offset."""
+        if not self.mm or offset >= self.size:
+            return self.size
+        limit = min(self.size, offset + MAX_LINE_BYTES)
+        newline = self.mm.find(b"\n", offset, limit)
+        return newline + 1 if newline >= 0 else limit
+
+    def previous_line(self, offset):
+        """Offset of the line before the one starting at offset."""
+        return self.line_start(offset - 1)
+
+    def read_lines(self, offset, count):
+        """(text, end offset) of up to count lines starting at offset."""
+        end = offset
+        for _ in range(count):
+            if end >= self.size:
+                break
+            end = self.next_line(end)
+        if not self.mm:
+            return "", end
+        return self.mm[offset:end].decode("utf-8", errors="replace"), end
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+
+
+class MappedFiles:
+    """Keeps the most recently viewed files mapped, closing the oldest."""
+
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self._files = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """The MappedText for path, remapped if the file changed on disk."""
+        stat = os.stat(path)
+        with self._lock:
+            text = self._files.pop(path, None)
+            if text is not None and text.signature != (
+                stat.st_mtime_ns,
+                stat.st_size,
+            ):
+                text.close()
+                text = None
+            if text is None:
+                text = MappedText(path)
+            self._files[path] = text
+            while len(self._files) > self.maxsize:
+                self._files.popitem(last=False)[1].close()
+        return text
+
+
+mapped_files = MappedFiles()
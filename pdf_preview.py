@@ -0,0 +1,124 @@
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import pymupdf as fitz
+except ImportError:
+    try:
+        import fitz  # PyMuPDF before 1.24
+    except ImportError:
+        fitz = None
+
+
+def render_page(path, page, zoom):
+    """Render one PDF page to PNG bytes; returns (png, page_count).
+
+    Runs in a worker process, so it only takes and returns plain values.
+    """
+    with fitz.open(path) as doc:
+        count = doc.page_count
+        if count == 0:
+            return None, 0
+        page = max(0, min(page, count - 1))
+        pixmap = doc[page].get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+        return pixmap.tobytes("png"), count
+
+
+def page_count(path):
+    """Number of pages of a PDF, or 1 when PyMuPDF is missing or it cannot be read."""
+    if fitz is None:
+        return 1
+    try:
+        with fitz.open(path) as doc:
+            return max(doc.page_count, 1)
+    except Exception:
+        return 1
+
+
+class PdfRenderer:
+    """Renders PDF pages on a small process pool and keeps recent pages.
+
+    Rendered pages are kept as PNG bytes in an LRU cache of maxsize pages,
+    keyed by the file's mtime so an updated PDF is rendered again.
+    request() delivers results through results, which the Tk thread polls;
+    prefetch() only warms the cache.
+    """
+
+    def __init__(self, workers=2, maxsize=48, zoom=1.0):
+        self.workers = workers
+        self.maxsize = maxsize
+        self.zoom = zoom
+        self.results = queue.Queue()
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._pool = None
+
+    @property
+    def available(self):
+        return fitz is not None
+
+    def key(self, path, page):
+        return (path, os.stat(path).st_mtime_ns, page, self.zoom)
+
+    def request(self, path, page, tag=None):
+        """Render (or fetch) path's page; (tag, path, page, png, count, error)
+        is put on results when it is ready."""
+        self._submit(path, page, tag, deliver=True)
+
+    def prefetch(self, path, pages=(0, 1)):
+        for page in pages:
+            self._submit(path, page, None, deliver=False)
+
+    def _submit(self, path, page, tag, deliver):
+        try:
+            key = self.key(path, page)
+        except OSError as e:
+            if deliver:
+                self.results.put((tag, path, page, None, 0, str(e)))
+            return
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                if deliver:
+                    self.results.put((tag, path, page) + cached + (None,))
+                return
+            waiters = self._pending.get(key)
+            if waiters is not None:
+                # Already rendering (e.g. prefetched); answer when it lands
+                if deliver:
+                    waiters.append(tag)
+                return
+            self._pending[key] = [tag] if deliver else []
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            future = self._pool.submit(render_page, path, page, self.zoom)
+        future.add_done_callback(lambda f: self._done(key, f))
+
+    def _done(self, key, future):
+        path, _, page, _ = key
+        try:
+            result = future.result()
+            error = None
+        except Exception as e:
+            result, error = (None, 0), str(e)
+        with self._lock:
+            waiters = self._pending.pop(key, [])
+            if error is None:
+                self._cache[key] = result
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+        for tag in waiters:
+            self.results.put((tag, path, page) + result + (error,))
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+renderer = PdfRenderer()
@@ -0,0 +1,113 @@
+import threading
+
+import pandas as pd
+
+from case_store import store
+from config import prefetch_window
+from file_index import file_index
+
+
+def note_text(value):
+    """Notes cell as display text; NaN and "nan" read back from Excel are blank."""
+    if value is None or pd.isna(value) or str(value).lower() == "nan":
+        return ""
+    return str(value)
+
+
+def prepare_case(pos):
+    """Everything load_case needs to show row pos, decoded up front."""
+    case_id = store.case_ids[pos]
+    row = store.df.iloc[pos]
+    return {
+        "case_id": case_id,
+        "ticks": store.labels[pos].tolist(),
+        "notes": note_text(row.get("Notes", "")),
+        "judge_notes": note_text(row.get("Judge Notes", "")),
+        "case_done": int(row.get("Case Done", "") == 1),
+        "pdf": file_index.has_pdf(case_id),
+        "txt": file_index.has_txt(case_id),
+    }
+
+
+class Prefetcher:
+    """Background thread that prepares the cases around the current one.
+
+    After request(center) the rows within window positions of center are
+    decoded with prepare_case() and kept until navigation moves away, so
+    Next/Previous only has to copy values into the widgets. discard(pos)
+    must be called after a row is edited; a stale entry is never served.
+    """
+
+    def __init__(self, window=5):
+        self.window = window
+        self._cond = threading.Condition()
+        self._cache = {}
+        self._center = None
+        self._generation = 0  # bumped by every discard()
+        self._thread = None
+
+    def request(self, center):
+        """Prefetch the window around center, dropping entries outside it."""
+        if self.window <= 0:
+            return
+        with self._cond:
+            self._center = center
+            low, high = center - self.window, center + self.window
+            self._cache = {
+                pos: case for pos, case in self._cache.items() if low <= pos <= high
+            }
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="case-prefetch", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def get(self, pos):
+        """The prepared case at pos, computed now if it was not prefetched."""
+        with self._cond:
+            case = self._cache.get(pos)
+        return case if case is not None else prepare_case(pos)
+
+    def discard(self, pos):
+        with self._cond:
+            self._cache.pop(pos, None)
+            self._generation += 1
+            self._cond.notify_all()
+
+    def clear(self):
+        """Drop everything prepared, e.g. after the rows were reloaded."""
+        with self._cond:
+            self._cache = {}
+            self._generation += 1
+
+    def _next_missing(self):
+        """Closest position to the center that is not prepared yet."""
+        if self._center is None:
+            return None
+        for distance in range(self.window + 1):
+            for pos in (self._center + distance, self._center - distance):
+                if 0 <= pos < len(store) and pos not in self._cache:
+                    return pos
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._next_missing() is not None)
+                pos = self._next_missing()
+                generation = self._generation
+            try:
+                case = prepare_case(pos)
+            except Exception:
+                # Leave it to get(), which prepares the row on the Tk thread
+                case = None
+            with self._cond:
+                # An edit since we read the row makes this copy stale
+                if generation == self._generation:
+                    low = self._center - self.window
+                    if low <= pos <= self._center + self.window:
+                        self._cache[pos] = case
+
+
+prefetcher = Prefetcher(prefetch_window)
@@ -0,0 +1,261 @@
+import hashlib
+import os
+import queue
+import re
+import sqlite3
+import threading
+
+from config import sidecar_path
+
+TOKEN_RE = re.compile(r"\w+")
+# A "quoted phrase" (the closing quote may be missing) or a bare word
+QUERY_RE = re.compile(r'"([^"]*)"?|([^\s"]+)')
+READ_CHUNK = 1 << 20
+BATCH = 1000  # docs written per transaction during a sync
+
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # The index can always be rebuilt, so skip the per-commit fsync
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS docs "
+        "USING fts5(case_id UNINDEXED, body, tokenize='unicode61')"
+    )
+    # Which docs row holds each (case, source) and the content it was built from
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS sources ("
+        "case_id TEXT NOT NULL, source TEXT NOT NULL, signature TEXT NOT NULL, "
+        "doc INTEGER NOT NULL, PRIMARY KEY (case_id, source))"
+    )
+    return conn
+
+
+def text_signature(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def file_terms(path):
+    """Distinct lowercase words of a text file, read in chunks.
+
+    Indexing the distinct words rather than the text keeps multi-hundred-MB
+    transcripts small in the index; words still match, phrases do not.
+    """
+    terms = set()
+    tail = ""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK), ""):
+            words = TOKEN_RE.findall(tail + chunk)
+            # The last word may continue in the next chunk
+            tail = words.pop() if words and chunk[-1:].isalnum() else ""
+            terms.update(word.lower() for word in words)
+    if tail:
+        terms.add(tail.lower())
+    return " ".join(sorted(terms))
+
+
+def match_expression(query, phrases=True):
+    """FTS5 query matching every word and "quoted phrase" of query.
+
+    A trailing bare word also matches as a prefix. With phrases=False a
+    phrase only needs all of its words, which is all the distinct-word TXT
+    docs can answer.
+    """
+    terms = []
+    prefix = False
+    for phrase, word in QUERY_RE.findall(query):
+        words = TOKEN_RE.findall(phrase or word)
+        if not words:
+            continue
+        if phrase and phrases:
+            terms.append('"' + " ".join(words) + '"')
+        else:
+            terms.extend(f'"{word}"' for word in words)
+        prefix = not phrase
+    if not terms:
+        return None
+    if prefix:
+        terms[-1] += "*"
+    return " AND ".join(terms)
+
+
+# Docs of one source matching an FTS5 expression, with their rank
+SOURCE_MATCH = (
+    "SELECT docs.case_id, docs.rank AS score FROM docs "
+    "JOIN sources ON sources.case_id = docs.case_id AND sources.doc = docs.rowid "
+    "WHERE docs MATCH ? AND sources.source = ?"
+)
+
+
+class SearchIndex:
+    """Persistent full-text index of case notes and TXT files.
+
+    Backed by an SQLite FTS5 table next to the workbook, so it survives
+    restarts and only changed notes and files are re-indexed. Writes happen
+    on one background thread fed by a queue; search() reads on the caller's
+    thread.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or sidecar_path(".search.sqlite")
+        self.jobs = queue.Queue()
+        self.ready = False  # True once the startup sync has finished
+        self._thread = None
+
+    def start(self, notes, txt_paths):
+        """Sync the index with the workbook and TXT folder in the background.
+
+        notes maps every case ID to its notes text. txt_paths is called on
+        the index thread and returns {case ID: path} for the cases that have
+        a TXT file, so slow folder listings stay off the caller's thread.
+        """
+        self.jobs.put(("sync", notes, txt_paths))
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="search-index", daemon=True
+            )
+            self._thread.start()
+
+    def update_notes(self, case_id, text):
+        """Re-index one case's notes after it was saved."""
+        self.jobs.put(("notes", case_id, text))
+
+    def search(self, query, limit=500):
+        """Case IDs (as strings) matching every word of query, best first.
+
+        Quoted phrases must appear as written in the notes; TXT files are
+        indexed as distinct words, so there a phrase matches by its words.
+        """
+        expression = match_expression(query)
+        if expression is None:
+            return []
+        conn = connect(self.db_path)
+        try:
+            rows = conn.execute(
+                f"{SOURCE_MATCH} UNION ALL {SOURCE_MATCH} ORDER BY score",
+                (expression, "notes", match_expression(query, phrases=False), "txt"),
+            )
+            seen = {}
+            for case_id, _ in rows:
+                seen.setdefault(case_id, None)
+                if len(seen) >= limit:
+                    break
+            return list(seen)
+        finally:
+            conn.close()
+
+    def _run(self):
+        conn = connect(self.db_path)
+        while True:
+            job = self.jobs.get()
+            try:
+                if job[0] == "sync":
+                    self._sync(conn, job[1], job[2]())
+                    self.ready = True
+                elif job[0] == "notes":
+                    self._put(conn, str(job[1]), "notes", job[2])
+            except (OSError, sqlite3.Error) as e:
+                print(f"Search index update failed: {e}")
+
+    def _put(self, conn, case_id, source, body, signature=None):
+        """Replace the doc of (case_id, source) unless it is unchanged."""
+        signature = signature or text_signature(body)
+        row = conn.execute(
+            "SELECT signature, doc FROM sources WHERE case_id = ? AND source = ?",
+            (case_id, source),
+        ).fetchone()
+        if row is not None and row[0] == signature:
+            return
+        own = not conn.in_transaction
+        if own:
+            conn.execute("BEGIN")
+        try:
+            if row is not None:
+                self._drop(conn, case_id, source, row[1])
+            if body.strip():
+                doc = conn.execute(
+                    "INSERT INTO docs (case_id, body) VALUES (?, ?)", (case_id, body)
+                ).lastrowid
+                conn.execute(
+                    "INSERT INTO sources VALUES (?, ?, ?, ?)",
+                    (case_id, source, signature, doc),
+                )
+            if own:
+                conn.execute("COMMIT")
+        except BaseException:
+            if own:
+                conn.execute("ROLLBACK")
+            raise
+
+    def _drop(self, conn, case_id, source, doc):
+        conn.execute("DELETE FROM docs WHERE rowid = ?", (doc,))
+        conn.execute(
+            "DELETE FROM sources WHERE case_id = ? AND source = ?", (case_id, source)
+        )
+
+    def _sync(self, conn, notes, txt_paths):
+        notes = {str(case_id): text for case_id, text in notes.items()}
+        txt_paths = {str(case_id): path for case_id, path in txt_paths.items()}
+        known = {
+            (case_id, source): (signature, doc)
+            for case_id, source, signature, doc in conn.execute(
+                "SELECT case_id, source, signature, doc FROM sources"
+            )
+        }
+        fresh = set()  # cases saved while the sync runs; newer than notes
+        conn.execute("BEGIN")
+        try:
+            # Forget cases and files that no longer exist
+            for (case_id, source), (_, doc) in known.items():
+                wanted = notes if source == "notes" else txt_paths
+                if case_id not in wanted:
+                    self._drop(conn, case_id, source, doc)
+            for count, (case_id, text) in enumerate(notes.items(), 1):
+                signature = text_signature(text)
+                stored = known.get((case_id, "notes"), (None,))[0]
+                if case_id not in fresh and stored != signature:
+                    self._put(conn, case_id, "notes", text, signature)
+                if count % BATCH == 0:
+                    self._apply_pending(conn, fresh)
+                    conn.execute("COMMIT")
+                    conn.execute("BEGIN")
+            for count, (case_id, path) in enumerate(txt_paths.items(), 1):
+                try:
+                    signature = file_signature(path)
+                    if known.get((case_id, "txt"), (None,))[0] != signature:
+                        self._put(conn, case_id, "txt", file_terms(path), signature)
+                except OSError:
+                    continue
+                # TXT files can be large; commit often so searches see progress
+                if count % 20 == 0:
+                    self._apply_pending(conn, fresh)
+                    conn.execute("COMMIT")
+                    conn.execute("BEGIN")
+            self._apply_pending(conn, fresh)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _apply_pending(self, conn, fresh):
+        """Apply note saves queued while a sync is running."""
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                return
+            if job[0] == "notes":
+                self._put(conn, str(job[1]), "notes", job[2])
+                fresh.add(str(job[1]))
+            else:
+                self.jobs.put(job)  # a newer sync runs after this one
+                return
+
+
+search_index = SearchIndex()
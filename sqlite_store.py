@@ -0,0 +1,124 @@
+import math
+import sqlite3
+
+import pandas as pd
+
+TABLE = "cases"
+ORDER_COLUMN = "_row"  # keeps the workbook's row order
+TEXT_COLUMNS = {"Notes", "Judge Notes"}
+
+
+def quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def column_type(name, series=None):
+    """Labels and Case Done hold 1 or NULL, so INTEGER affinity keeps them small."""
+    if name == "Case ID":
+        if series is not None and pd.api.types.infer_dtype(series) == "integer":
+            return "INTEGER"
+        return "TEXT"
+    if name in TEXT_COLUMNS:
+        return "TEXT"
+    return "INTEGER"
+
+
+def sql_value(value):
+    """Blank cells ("", NaN, None) are stored as NULL."""
+    if hasattr(value, "item"):
+        value = value.item()
+    if value is None or (isinstance(value, str) and value == ""):
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def write_frame(df, db_path):
+    """Replace the cases table with df in a single transaction."""
+    if df["Case ID"].duplicated().any():
+        raise ValueError("Case IDs must be unique to use the sqlite backend.")
+    columns = list(df.columns)
+    definitions = [f"{quote(ORDER_COLUMN)} INTEGER NOT NULL"]
+    for col in columns:
+        definition = f"{quote(col)} {column_type(col, df[col])}"
+        if col == "Case ID":
+            definition += " PRIMARY KEY"
+        definitions.append(definition)
+    placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+    names = ", ".join(quote(col) for col in [ORDER_COLUMN] + columns)
+
+    conn = connect(db_path)
+    try:
+        conn.execute("BEGIN")
+        conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        conn.execute(f"CREATE TABLE {TABLE} ({', '.join(definitions)})")
+        conn.executemany(
+            f"INSERT INTO {TABLE} ({names}) VALUES ({placeholders})",
+            (
+                [pos] + [sql_value(v) for v in row]
+                for pos, row in enumerate(df.itertuples(index=False, name=None))
+            ),
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def read_frame(db_path):
+    """Load the whole cases table in its original row order."""
+    conn = connect(db_path)
+    try:
+        df = pd.read_sql_query(
+            f"SELECT * FROM {TABLE} ORDER BY {quote(ORDER_COLUMN)}", conn
+        )
+    finally:
+        conn.close()
+    return df.drop(columns=[ORDER_COLUMN])
+
+
+def update_rows(rows, db_path):
+    """Update single rows in place; rows is {position: {column: value}}.
+
+    Every row dict must include "Case ID". Columns that do not exist yet
+    (e.g. Judge Notes) are added to the table first.
+    """
+    conn = connect(db_path)
+    try:
+        existing = {r[1] for r in conn.execute(f"PRAGMA table_info({TABLE})")}
+        conn.execute("BEGIN")
+        for values in rows.values():
+            for col in values:
+                if col not in existing:
+                    conn.execute(
+                        f"ALTER TABLE {TABLE} ADD COLUMN {quote(col)} {column_type(col)}"
+                    )
+                    existing.add(col)
+            columns = [col for col in values if col != "Case ID"]
+            if not columns:
+                continue
+            assignments = ", ".join(f"{quote(col)} = ?" for col in columns)
+            cursor = conn.execute(
+                f'UPDATE {TABLE} SET {assignments} WHERE "Case ID" = ?',
+                [sql_value(values[col]) for col in columns]
+                + [sql_value(values["Case ID"])],
+            )
+            if cursor.rowcount == 0:
+                raise KeyError(values["Case ID"])
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
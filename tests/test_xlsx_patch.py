@@ -0,0 +1,30 @@
+import pandas as pd
+
+from xlsx_patch import patch_rows
+
+
+def write_cases(path):
+    pd.DataFrame(
+        {"Case ID": [1, 2, 3], "Notes": ["a", "b", "c"], "Case Done": ["", "", ""]}
+    ).to_excel(path, index=False)
+
+
+def test_patch_row_reads_back(tmp_path):
+    path = str(tmp_path / "cases.xlsx")
+    write_cases(path)
+    patch_rows(
+        path, {1: {"Case ID": 2, "Notes": "checked <ok> & done", "Case Done": 1}}
+    )
+    df = pd.read_excel(path)
+    assert df["Case ID"].tolist() == [1, 2, 3]
+    assert df["Notes"].tolist() == ["a", "checked <ok> & done", "c"]
+    assert df.loc[1, "Case Done"] == 1
+
+
+def test_illegal_characters_are_dropped(tmp_path):
+    path = str(tmp_path / "cases.xlsx")
+    write_cases(path)
+    patch_rows(path, {0: {"Case ID": 1, "Notes": "page1\x0cpage2\x00"}})
+    df = pd.read_excel(path)
+    assert df.loc[0, "Notes"] == "page1page2"
+    assert df["Notes"].tolist()[1:] == ["b", "c"]
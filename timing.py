@@ -0,0 +1,108 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from config import timing_enabled
+
+# EVAL_HELPER_TIMING=1 turns spans on without editing config.json
+enabled = os.environ.get("EVAL_HELPER_TIMING", "") not in ("", "0") or bool(
+    timing_enabled
+)
+
+WINDOW = 500  # durations kept per action for the percentiles
+MAX_EVENTS = 100000  # trace events kept for export
+
+_lock = threading.Lock()
+_durations = {}
+_events = deque(maxlen=MAX_EVENTS)
+_last = None  # name of the most recently finished span
+
+
+def timed(name):
+    """Decorator recording each call of the function as a span called name.
+
+    When timing is off the function is returned unchanged, so instrumented
+    code costs nothing.
+    """
+
+    def decorate(func):
+        if not enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, start, time.perf_counter_ns())
+
+        return wrapper
+
+    return decorate
+
+
+def record(name, start_ns, end_ns):
+    global _last
+    with _lock:
+        _durations.setdefault(name, deque(maxlen=WINDOW)).append(
+            (end_ns - start_ns) / 1e6
+        )
+        _events.append((name, start_ns, end_ns, threading.get_ident()))
+        _last = name
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summary(name):
+    """(last, p50, p95) in milliseconds for one action, or None."""
+    with _lock:
+        values = list(_durations.get(name, ()))
+    if not values:
+        return None
+    return values[-1], percentile(values, 0.5), percentile(values, 0.95)
+
+
+def status_text():
+    """One-line readout of the most recent action for the status area."""
+    name = _last
+    stats = summary(name) if name else None
+    if stats is None:
+        return ""
+    last, p50, p95 = stats
+    return f"{name}: {last:.1f} ms (p50 {p50:.1f}, p95 {p95:.1f})"
+
+
+def export(path):
+    """Write the recorded spans as JSON lines (.jsonl) or a Chrome trace.
+
+    Chrome traces open in chrome://tracing or https://ui.perfetto.dev.
+    Returns the number of spans written.
+    """
+    with _lock:
+        events = list(_events)
+    pid = os.getpid()
+    spans = [
+        {
+            "name": name,
+            "ph": "X",
+            "ts": start / 1000,
+            "dur": (end - start) / 1000,
+            "pid": pid,
+            "tid": tid,
+        }
+        for name, start, end, tid in events
+    ]
+    with open(path, "w") as f:
+        if path.lower().endswith(".jsonl"):
+            for span in spans:
+                f.write(json.dumps(span) + "\n")
+        else:
+            json.dump({"traceEvents": spans, "displayTimeUnit": "ms"}, f)
+    return len(spans)
@@ -1,15 +1,25 @@
 import tkinter as tk
 from tkinter import scrolledtext, ttk
 
-from config import default_theme
-from data import load_dataframe
+import timing
+from case_store import store
+from config import (
+    EXCEL_PATH,
+    default_theme,
+    last_case_id,
+    progressive_startup,
+    storage_backend,
+)
+from data import cache_meta
+from file_index import file_index
 from global_vars import *
 from tooltip import ToolTip
 from ui_functions import *
+from virtual_widgets import PdfPreview, TextPager, VirtualCheckboxGrid
 
 
 def build_ui(root):
-    global notes_text, notes_text_judge, theme_combobox, case_label_var, progress_bar, status_label, jump_entry, checkbox_vars, case_done_var, main_canvas, main_frame, checkbox_canvas, checkbox_frame
+    global notes_text, notes_text_judge, theme_combobox, case_label_var, progress_bar, status_label, jump_entry, checkbox_vars, case_done_var, main_canvas, main_frame, checkbox_grid
 
     style = ttk.Style(root)
     style.theme_use(default_theme)
@@ -92,6 +102,17 @@ def build_ui(root):
     options_menu.add_command(
         label="Settings", command=lambda: open_settings(root, theme_combobox)
     )
+    options_menu.add_command(
+        label="Compact Workbook", command=lambda: compact_workbook(root)
+    )
+    if storage_backend == "sqlite":
+        options_menu.add_command(
+            label="Export to Excel", command=lambda: export_workbook(root)
+        )
+    if timing.enabled:
+        options_menu.add_command(
+            label="Export Timing Trace...", command=lambda: export_timing(root)
+        )
     menubar.add_cascade(label="Options", menu=options_menu)
     root.config(menu=menubar)
 
@@ -154,6 +175,33 @@ def build_ui(root):
     jump_btn.pack(side=tk.LEFT)
     ToolTip(jump_btn, "Jump to a specific Case ID.")
 
+    # Full-text search over notes and TXT files
+    search_entry = ttk.Entry(jump_frame, width=20)
+    search_entry.pack(side=tk.LEFT, padx=(20, 5))
+    search_btn = ttk.Button(
+        jump_frame,
+        text="Search",
+        command=lambda: search_cases(
+            search_entry,
+            lambda i: load_case(
+                i,
+                case_label_var,
+                notes_text,
+                checkbox_vars,
+                case_done_var,
+                notes_text_judge,
+            ),
+        ),
+    )
+    search_btn.pack(side=tk.LEFT)
+    search_entry.bind("<Return>", lambda event: search_btn.invoke())
+    ToolTip(
+        search_btn,
+        "Find cases whose notes or TXT file contain these words. "
+        'Put a phrase in "quotes" to match it exactly in notes; '
+        "TXT files match the phrase's words anywhere.",
+    )
+
     # File Frame
     file_frame = ttk.Frame(main_frame, padding=5)
     file_frame.pack(pady=5)
@@ -179,11 +227,13 @@ def build_ui(root):
         status_frame, orient="horizontal", mode="determinate"
     )
     progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
-    status_label = ttk.Label(
-        status_frame, text=f"Cases Done: 0 / {len(load_dataframe())}"
-    )
+    status_label = ttk.Label(status_frame, text=f"Cases Done: 0 / {len(store)}")
     status_label.pack(side=tk.LEFT)
-    ToolTip(status_label, get_progress_message())
+    if timing.enabled:
+        # Latency of the most recent action, refreshed while timing is on
+        timing_label = ttk.Label(status_frame, text="")
+        timing_label.pack(side=tk.LEFT, padx=(10, 0))
+        poll_timing(root, timing_label)
 
     update_progress(progress_bar, status_label)
 
@@ -214,113 +264,39 @@ def build_ui(root):
     checkbox_outer_frame = ttk.Frame(main_frame, padding=10)
     checkbox_outer_frame.pack(pady=10, fill=tk.X)
 
-    # Create canvas with scrollbar - use 1/4 of window height instead of fixed pixels
+    # Only a screenful of checkboxes is created; see VirtualCheckboxGrid
     window_height = root.winfo_height()
     checkbox_height = max(
         150, window_height // 4
     )  # Use 1/4 of window height with minimum 150px
-    checkbox_canvas = tk.Canvas(checkbox_outer_frame, height=checkbox_height)
-    checkbox_scrollbar = ttk.Scrollbar(
-        checkbox_outer_frame, orient=tk.VERTICAL, command=checkbox_canvas.yview
-    )
-    checkbox_frame = ttk.Frame(checkbox_canvas)
-
-    # Configure scrolling
-    checkbox_canvas.configure(yscrollcommand=checkbox_scrollbar.set)
-
-    # Pack canvas and scrollbar properly
-    checkbox_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-    checkbox_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-    # Make checkbox frame fill width of canvas - KEY FIX
-    def configure_checkbox_canvas(event):
-        # Prevent recursion
-        if (
-            hasattr(configure_checkbox_canvas, "processing")
-            and configure_checkbox_canvas.processing
-        ):
-            return
-
-        try:
-            configure_checkbox_canvas.processing = True
 
-            # Set the checkbox frame to be the width of the canvas
-            canvas_width = event.width
-            checkbox_canvas.itemconfig(checkbox_canvas_window, width=canvas_width)
-
-            # Update the scroll region to match content height
-            checkbox_canvas.configure(scrollregion=checkbox_canvas.bbox("all"))
-        finally:
-            configure_checkbox_canvas.processing = False
-
-    # Create window and bind configuration
-    checkbox_canvas_window = checkbox_canvas.create_window(
-        (0, 0), window=checkbox_frame, anchor="nw"
-    )
-
-    # Bind canvas resize and frame changes to update scroll region
-    checkbox_canvas.bind("<Configure>", configure_checkbox_canvas)
-    checkbox_frame.bind(
-        "<Configure>",
-        lambda e: checkbox_canvas.configure(scrollregion=checkbox_canvas.bbox("all")),
-    )
-
-    # Fixed mouse wheel scrolling - check bounds
-    def on_checkbox_scroll(event):
-        # Get the current position and total height
-        current_pos = checkbox_canvas.yview()
-
-        # Only scroll if not at the boundaries
-        if (event.delta > 0 and current_pos[0] > 0) or (
-            event.delta < 0 and current_pos[1] < 1.0
-        ):
-            checkbox_canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-
-    # Use direct bindings with the fixed scroll function
-    checkbox_canvas.bind("<MouseWheel>", on_checkbox_scroll)
-    checkbox_frame.bind("<MouseWheel>", on_checkbox_scroll)
-
-    # Add checkboxes as before
+    # One IntVar per label; the grid points its pooled widgets at these
     checkbox_vars = {}
-    df = load_dataframe()
-    columns = [
-        col for col in df.columns if col not in ["Case ID", "Notes", "Case Done"]
-    ]
-
-    # Calculate how many columns to use based on window width
-    # Default to 4 columns
-    num_columns = 4
-
-    # Configure the grid for centering - KEY FIX
-    for i in range(num_columns):
-        checkbox_frame.columnconfigure(i, weight=1, uniform="checkbox_col")
-
-    # Add checkboxes with proper grid positioning
-    for i, col in enumerate(columns):
+    columns = store.schema.labels
+    for col in columns:
         var = tk.IntVar(master=root)
         var.trace_add("write", mark_unsaved)
-        # Create wrapper frame for each checkbox with proper grid settings
-        wrapper = ttk.Frame(checkbox_frame, padding=5)
-        wrapper.grid(
-            row=i // num_columns,
-            column=i % num_columns,
-            sticky="w",  # Align checkbox left within cell
-            padx=10,
-            pady=4,
-        )
-        cb = ttk.Checkbutton(wrapper, text=col, variable=var)
-        cb.pack(anchor="w")
         checkbox_vars[col] = var
 
+    checkbox_grid = VirtualCheckboxGrid(
+        checkbox_outer_frame,
+        columns,
+        checkbox_vars,
+        num_columns=4,
+        height=checkbox_height,
+    )
+    checkbox_grid.pack(fill=tk.X, expand=True)
+
     # --- Notes Area: Make AI Notes and Judge Notes side by side, equally sized, and expandable ---
 
     # Parent frame for both notes sections
     notes_parent_frame = ttk.Frame(main_frame, padding=(10, 10, 10, 0))
     notes_parent_frame.pack(pady=(10, 0), fill=tk.BOTH, expand=True)
 
-    # Configure grid for two columns, equal weight
+    # Configure grid for three columns, equal weight
     notes_parent_frame.columnconfigure(0, weight=1)
     notes_parent_frame.columnconfigure(1, weight=1)
+    notes_parent_frame.columnconfigure(2, weight=1)
     notes_parent_frame.rowconfigure(0, weight=1)
 
     # AI Notes Frame
@@ -349,6 +325,22 @@ def build_ui(root):
     )
     notes_text_judge.pack(fill=tk.BOTH, expand=True, padx=0, pady=(5, 0))
 
+    # Case TXT file, paged from a memory map so large files open instantly
+    txt_frame = ttk.Frame(notes_parent_frame)
+    txt_frame.grid(row=0, column=2, sticky="nsew", padx=(10, 0))
+    ttk.Label(txt_frame, text="Case Text:").pack(anchor="w")
+    txt_pager = TextPager(txt_frame, width=60, height=15)
+    txt_pager.pack(fill=tk.BOTH, expand=True, padx=0, pady=(5, 0))
+    case_views.append(lambda case_id: show_case_text(txt_pager, case_id))
+
+    # PDF preview below the notes; pages are rendered in worker processes
+    pdf_frame = ttk.Frame(main_frame, padding=(10, 10, 10, 0))
+    pdf_frame.pack(pady=(10, 0), fill=tk.BOTH, expand=True)
+    ttk.Label(pdf_frame, text="PDF Preview:").pack(anchor="w")
+    pdf_preview = PdfPreview(pdf_frame, renderer)
+    pdf_preview.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+    case_views.append(lambda case_id: show_case_pdf(pdf_preview, case_id))
+
     # Add explicit paste binding
     notes_text.bind("<Control-v>", lambda event: paste_to_notes(event, notes_text))
 
@@ -380,9 +372,11 @@ def build_ui(root):
         notes_text_judge.configure(
             bg="#3e3e3e", fg="#ffffff", insertbackground="#ffffff"
         )
+        txt_pager.text.configure(bg="#3e3e3e", fg="#ffffff")
     else:
         notes_text.configure(bg="white", fg="black", insertbackground="black")
         notes_text_judge.configure(bg="white", fg="black", insertbackground="black")
+        txt_pager.text.configure(bg="white", fg="black")
 
     # Keyboard Shortcuts
     root.bind(
@@ -432,17 +426,15 @@ def _on_mousewheel_universal(event, main_frame=None):
     x, y = event.x_root, event.y_root
     widget_under_mouse = widget.winfo_containing(x, y)
 
-    # First check if mouse is over the checkbox canvas specifically
-    if "checkbox_canvas" in globals() and "checkbox_frame" in globals():
-        checkbox_canvas = globals()["checkbox_canvas"]
+    # First check if mouse is over the checkbox grid specifically
+    if "checkbox_grid" in globals():
+        checkbox_grid = globals()["checkbox_grid"]
 
-        # Check if mouse is over the checkbox canvas or its children
+        # Check if mouse is over the checkbox grid or its children
         parent = widget_under_mouse
         while parent:
-            if parent == checkbox_canvas or parent == globals()["checkbox_frame"]:
-                # Only scroll if content exceeds visible area
-                if checkbox_canvas.winfo_height() < checkbox_canvas.bbox("all")[3]:
-                    checkbox_canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+            if parent == checkbox_grid:
+                checkbox_grid.on_mousewheel(event)
                 return  # Exit early in any case to prevent scrolling main canvas
             try:
                 parent = parent.master
@@ -496,13 +488,13 @@ def on_window_resize(event=None):
             main_canvas = globals()["main_canvas"]
 
             # Update checkbox area height to 1/4 of window height
-            if "checkbox_canvas" in globals():
-                checkbox_canvas = globals()["checkbox_canvas"]
+            if "checkbox_grid" in globals():
+                checkbox_grid = globals()["checkbox_grid"]
                 window_height = root_window.winfo_height()
                 checkbox_height = max(
                     150, window_height // 4
                 )  # 1/4 of window height, min 150px
-                checkbox_canvas.configure(height=checkbox_height)
+                checkbox_grid.set_height(checkbox_height)
 
             # Handle both notes widgets
             if "notes_text" in globals():
@@ -522,24 +514,47 @@ def on_window_resize(event=None):
         on_window_resize.processing = False
 
 
-def start_app():
-    root = tk.Tk()
+def start_app(root=None):
+    root = root or tk.Tk()
     # Set to a larger size and allow resizing
     root.geometry("800x600")
     root.minsize(800, 600)
 
+    # List the PDF/TXT folders in the background while the workbook loads
+    file_index.start()
+
+    # Parse the workbook once; every view reads from the shared store.
+    # Progressive startup shows a streamed preview and loads the rest later.
+    # A warm start reads the sidecar cache, which is faster than a preview
+    progressive = (
+        progressive_startup
+        and storage_backend == "excel"
+        and cache_meta(EXCEL_PATH) is None
+    )
+    if progressive:
+        store.load_preview(case_id=last_case_id)
+    else:
+        store.ensure_loaded()
+
     # Configure the root window to give weight to rows/columns for better resizing
     root.grid_columnconfigure(0, weight=1)
     root.grid_rowconfigure(0, weight=1)
 
     build_ui(root)
+    poll_writer(root)
+    poll_files(root, progress_bar, status_label)
 
     # Window resize handler to help ensure notes area expands properly
     root.bind("<Configure>", on_window_resize, add="+")
 
+    # Reopen the case that was on screen when the app was last closed
+    start_index = None
+    if last_case_id is not None:
+        start_index = store.position_of(last_case_id)
+
     # After loading case, force layout update
     load_case(
-        0,
+        start_index or 0,
         globals().get("case_label_var"),
         globals().get("notes_text"),
         globals().get("checkbox_vars"),
@@ -551,5 +566,12 @@ def start_app():
     root.update_idletasks()
     on_window_resize()  # Call once at startup
 
+    if progressive:
+        start_background_load(
+            root, progress_bar, status_label, checkbox_grid, checkbox_vars
+        )
+    else:
+        start_search_index()
+
     root.protocol("WM_DELETE_WINDOW", lambda: on_closing(root))
     root.mainloop()
@@ -1,20 +1,33 @@
 import os
+import queue
+import sqlite3
+import threading
 import tkinter as tk
 import webbrowser
-from tkinter import messagebox, ttk
+from tkinter import filedialog, messagebox, ttk
 
-import pandas as pd
 
+import journal
+import timing
+from case_store import store
 from config import *
-from data import load_dataframe, save_dataframe
+from data import write_cache
+from file_index import file_index
 from global_vars import *
+from mapped_text import mapped_files
+from pdf_preview import renderer
+from prefetch import note_text, prefetcher
+from search_index import search_index
+from timing import timed
+from virtual_widgets import VirtualListbox
+from writer import writer
 
 # Global data variables
-df = load_dataframe()
-case_ids = df["Case ID"].tolist()
 current_index = 0
 unsaved_changes = False
 loading_case = False  # Add a flag to track when loading is happening
+# Callables given each case ID that load_case shows (e.g. the TXT pane)
+case_views = []
 
 
 def change_theme(event, theme_combobox, style, root, notes_text):
@@ -66,6 +79,7 @@ def create_dark_theme(style):
         pass
 
 
+@timed("load_case")
 def load_case(
     index,
     case_label_var,
@@ -74,43 +88,38 @@ def load_case(
     case_done_var,
     notes_text_judge=None,
 ):
-    global current_index, unsaved_changes, df, loading_case
-    if index < 0 or index >= len(case_ids):
+    global current_index, unsaved_changes, loading_case
+    if index < 0 or index >= len(store.case_ids):
         return
     current_index = index
+    # Usually prepared in the background already; see prefetch.py
+    case = prefetcher.get(current_index)
+    prefetcher.request(current_index)
 
     # Set the loading flag to prevent marking changes during loading
     loading_case = True
     unsaved_changes = False
 
-    case_id = case_ids[current_index]
-    case_label_var.set(f"Case ID: {case_id}")
-    row = df.loc[df["Case ID"] == case_id].iloc[0]
-    for col in df.columns:
-        if col in ["Case ID", "Notes", "Case Done", "Judge Notes"]:
-            continue
-        checkbox_vars[col].set(int(row[col] == 1))
-    notes_val = row.get("Notes", "")
-    if pd.isna(notes_val) or str(notes_val).lower() == "nan":
-        notes_val = ""
+    case_label_var.set(f"Case ID: {case['case_id']}")
+    for label, tick in zip(store.schema, case["ticks"]):
+        checkbox_vars[label].set(tick)
     notes_text.delete("1.0", tk.END)
-    notes_text.insert(tk.END, str(notes_val))
+    notes_text.insert(tk.END, case["notes"])
 
     # Load Judge Notes if widget is provided
     if notes_text_judge is not None:
-        judge_val = row.get("Judge Notes", "")
-        if pd.isna(judge_val) or str(judge_val).lower() == "nan":
-            judge_val = ""
         notes_text_judge.delete("1.0", tk.END)
-        notes_text_judge.insert(tk.END, str(judge_val))
+        notes_text_judge.insert(tk.END, case["judge_notes"])
 
-    case_done_val = row.get("Case Done", "")
-    case_done_var.set(int(case_done_val == 1))
+    case_done_var.set(case["case_done"])
+    for view in case_views:
+        view(case["case_id"])
 
     # Done loading, reset the flag
     loading_case = False
 
 
+@timed("save_case")
 def save_case(
     checkbox_vars,
     notes_text,
@@ -119,25 +128,28 @@ def save_case(
     status_label,
     notes_text_judge=None,
 ):
-    global unsaved_changes, df
-    case_id = case_ids[current_index]
-    for col in df.columns:
-        if col in ["Case ID", "Notes", "Case Done", "Judge Notes"]:
-            continue
-        df.loc[df["Case ID"] == case_id, col] = 1 if checkbox_vars[col].get() else ""
-    df.loc[df["Case ID"] == case_id, "Notes"] = notes_text.get("1.0", tk.END).strip()
-    df.loc[df["Case ID"] == case_id, "Case Done"] = 1 if case_done_var.get() else ""
-
-    # Save Judge Notes if widget is provided
-    if notes_text_judge is not None:
-        # Add the column if it doesn't exist
-        if "Judge Notes" not in df.columns:
-            df["Judge Notes"] = ""
-        df.loc[df["Case ID"] == case_id, "Judge Notes"] = notes_text_judge.get(
-            "1.0", tk.END
-        ).strip()
-
-    save_dataframe(df)
+    global unsaved_changes
+    case_id = store.case_ids[current_index]
+    pos = store.position_of(case_id)
+    values = row_values(checkbox_vars, notes_text, case_done_var, notes_text_judge)
+    if store.loading:
+        # The preview's labels come from its first rows only; which columns
+        # are labels is known once the whole workbook has been read
+        values = {
+            col: value for col, value in values.items() if col not in store.schema
+        }
+    changed = store.update_row(pos, values)
+
+    # The journal append is the durable save; Excel is updated on compaction
+    if changed:
+        prefetcher.discard(pos)
+        if "Notes" in changed or "Judge Notes" in changed:
+            search_index.update_notes(case_id, case_notes(pos))
+        journal.append(case_id, changed)
+        store.dirty.add(pos)
+        store.pending_edits += 1
+    if store.pending_edits >= compact_every:
+        compact_journal()
     unsaved_changes = False
 
     # Replace messagebox with toast notification
@@ -147,9 +159,266 @@ def save_case(
     update_progress(progress_bar, status_label)
 
 
+def case_notes(pos):
+    """Notes and Judge Notes of one case as the text the search index holds."""
+    row = store.df.iloc[pos]
+    return "\n".join(note_text(row.get(col, "")) for col in ("Notes", "Judge Notes"))
+
+
+def start_search_index():
+    """Bring the on-disk search index up to date in the background."""
+    df = store.df
+    notes = df["Notes"].tolist()
+    judge = df["Judge Notes"].tolist() if "Judge Notes" in df.columns else []
+    texts = {
+        case_id: "\n".join(
+            [note_text(notes[pos])] + ([note_text(judge[pos])] if judge else [])
+        )
+        for pos, case_id in enumerate(store.case_ids)
+    }
+
+    def txt_paths():
+        file_index.refresh()
+        return {
+            case_id: file_index.path(case_id, ".txt")
+            for case_id in store.case_ids
+            if file_index.has_txt(case_id)
+        }
+
+    search_index.start(texts, txt_paths)
+
+
+def search_cases(search_entry, load_func):
+    """List the cases whose notes or TXT file contain every searched word."""
+    query = search_entry.get().strip()
+    if not query:
+        return
+    try:
+        matches = search_index.search(query)
+    except sqlite3.Error as e:
+        messagebox.showerror("Search", f"Search failed: {e}")
+        return
+    positions = {str(case_id): pos for case_id, pos in store.index.items()}
+    matches = [case_id for case_id in matches if case_id in positions]
+
+    window = tk.Toplevel()
+    window.title(f"Search: {query}")
+    status = f"{len(matches)} matching case(s)"
+    if not search_index.ready:
+        status += " (index still building)"
+    if '"' in query:
+        status += "\nPhrases match exactly in notes; TXT files match their words."
+    ttk.Label(window, text=status).pack(pady=(5, 0))
+
+    def open_case(case_id):
+        if check_unsaved():
+            load_func(positions[case_id])
+            window.destroy()
+
+    results = VirtualListbox(window, matches, on_activate=open_case)
+    results.pack(fill="both", expand=True, padx=5, pady=5)
+
+
+def row_values(checkbox_vars, notes_text, case_done_var, notes_text_judge=None):
+    """Read the edited case from the widgets as {column: value}."""
+    values = {label: 1 if checkbox_vars[label].get() else "" for label in store.schema}
+    values["Notes"] = notes_text.get("1.0", tk.END).strip()
+    values["Case Done"] = 1 if case_done_var.get() else ""
+    # Judge Notes is only saved when its widget is provided
+    if notes_text_judge is not None:
+        values["Judge Notes"] = notes_text_judge.get("1.0", tk.END).strip()
+    return values
+
+
+def write_rows(positions, journal_seq):
+    """Hand the given rows to the background writer.
+
+    Rows are patched in place unless save_mode is "full", in which case the
+    writer gets a copy of the whole frame.
+    """
+    if save_mode == "full":
+        writer.submit_frame(store.frame(), journal_seq)
+    else:
+        writer.submit_rows(store.snapshot_rows(positions), journal_seq)
+
+
+def compact_journal():
+    """Queue journaled rows for the workbook; the writer truncates the journal."""
+    # Preview positions are not workbook rows; the journal keeps the edits
+    if not store.dirty or store.loading:
+        return
+    write_rows(sorted(store.dirty), journal.last_seq())
+    store.dirty.clear()
+    store.pending_edits = 0
+
+
+def compact_workbook(root):
+    """Rewrite the whole workbook from memory on explicit request."""
+    if store.loading:
+        show_toast(root, "Still loading the workbook, try again shortly.")
+        return
+    writer.submit_frame(store.frame(), journal.last_seq())
+    store.dirty.clear()
+    store.pending_edits = 0
+    show_toast(root, "Compacting workbook...")
+
+
+def export_workbook(root):
+    """Write the current cases to EXCEL_PATH in the background."""
+    if store.loading:
+        show_toast(root, "Still loading the workbook, try again shortly.")
+        return
+    writer.submit_export(store.frame())
+    show_toast(root, f"Exporting to {EXCEL_PATH}...")
+
+
+def handle_writer_result(root, result):
+    """React to one background write outcome; returns False on failure."""
+    status, message, positions = result
+    if status == "full_needed":
+        # The sheet lacks a column (e.g. Judge Notes): rewrite it in full
+        writer.submit_frame(store.frame(), journal.last_seq())
+    elif status == "failed":
+        # Everything is still in the journal; retry on the next compaction
+        store.mark_journal_dirty()
+        if root is not None:
+            show_toast(root, f"Saving workbook failed: {message}", bg_color="#E53935")
+        return False
+    else:
+        if status == "saved":
+            store.cache_stale = True
+        if root is not None:
+            show_toast(root, message)
+    return True
+
+
+def poll_writer(root):
+    """Deliver background write outcomes on the Tk thread."""
+    while True:
+        try:
+            result = writer.results.get_nowait()
+        except queue.Empty:
+            break
+        handle_writer_result(root, result)
+    root.after(200, poll_writer, root)
+
+
+def poll_files(root, progress_bar, status_label, version=None):
+    """Refresh the missing-files count whenever the file index rescans."""
+    if file_index.version != version:
+        version = file_index.version
+        update_progress(progress_bar, status_label)
+    root.after(1000, poll_files, root, progress_bar, status_label, version)
+
+
+def poll_timing(root, timing_label):
+    """Refresh the latency readout in the status area."""
+    timing_label.config(text=timing.status_text())
+    root.after(500, poll_timing, root, timing_label)
+
+
+def export_timing(root):
+    """Save the recorded timing spans as a Chrome trace or JSON lines."""
+    path = filedialog.asksaveasfilename(
+        parent=root,
+        title="Export Timing Trace",
+        defaultextension=".json",
+        filetypes=[("Chrome trace", "*.json"), ("JSON lines", "*.jsonl")],
+    )
+    if path:
+        count = timing.export(path)
+        show_toast(root, f"Exported {count} timing spans to {os.path.basename(path)}")
+
+
+def remember_case():
+    """Store the current Case ID in config.json to reopen it next time."""
+    if not len(store):
+        return
+    cfg = dict(load_config())
+    cfg["last_case_id"] = journal.plain_value(store.case_ids[current_index])
+    try:
+        save_config(cfg)
+    except OSError:
+        pass
+
+
+def loading_text():
+    return f"Loading cases... ({len(store)} shown)"
+
+
+def start_background_load(
+    root, progress_bar, status_label, checkbox_grid, checkbox_vars
+):
+    """Load the full workbook on a thread while the preview is in use.
+
+    The label checkboxes stay disabled until then, see poll_background_load.
+    """
+    checkbox_grid.set_enabled(False)
+    progress_bar.config(mode="indeterminate")
+    progress_bar.start(15)
+    status_label.config(text=loading_text())
+    results = queue.Queue()
+
+    def load():
+        try:
+            results.put(store.read_full())
+        except Exception as e:
+            results.put(e)
+
+    threading.Thread(target=load, name="workbook-load", daemon=True).start()
+    views = (progress_bar, status_label, checkbox_grid, checkbox_vars)
+    root.after(100, poll_background_load, root, results, *views)
+
+
+def poll_background_load(
+    root, results, progress_bar, status_label, checkbox_grid, checkbox_vars
+):
+    """Swap in the full workbook once the background load has finished."""
+    global current_index
+    try:
+        outcome = results.get_nowait()
+    except queue.Empty:
+        views = (progress_bar, status_label, checkbox_grid, checkbox_vars)
+        root.after(100, poll_background_load, root, results, *views)
+        return
+    progress_bar.stop()
+    progress_bar.config(mode="determinate")
+    if isinstance(outcome, Exception):
+        status_label.config(text="Loading failed")
+        messagebox.showerror(
+            "Loading Failed",
+            f"The workbook could not be loaded: {outcome}\n"
+            "Edits are kept in the journal; restart the app to try again.",
+        )
+        return
+    # The same case stays on screen; only its position changes. Rows without
+    # a Case ID are among the first preview rows, whose positions match.
+    case_id = store.case_ids[current_index]
+    store.finish_loading(*outcome)
+    prefetcher.clear()
+    if case_id is not None:
+        current_index = store.position_of(case_id) or 0
+    rebuild_checkboxes(checkbox_grid, checkbox_vars)
+    prefetcher.request(current_index)
+    update_progress(progress_bar, status_label)
+    start_search_index()
+
+
+def finish_writes():
+    """Flush every pending write before the app exits; False on failure."""
+    ok = True
+    while True:
+        writer.flush()
+        try:
+            result = writer.results.get_nowait()
+        except queue.Empty:
+            return ok
+        ok = handle_writer_result(None, result) and ok
+
+
 def next_case(load_func):
     global current_index
-    if current_index + 1 < len(case_ids) and check_unsaved():
+    if current_index + 1 < len(store.case_ids) and check_unsaved():
         load_func(current_index + 1)
 
 
@@ -162,26 +431,31 @@ def prev_case(load_func):
 def jump_to_case(jump_entry, load_func):
     try:
         target_id = int(jump_entry.get())
-        if target_id in case_ids and check_unsaved():
-            index = case_ids.index(target_id)
+        index = store.position_of(target_id)
+        if index is not None and check_unsaved():
             load_func(index)
+        elif store.loading:
+            messagebox.showinfo(
+                "Loading", f"Case ID {target_id} is not loaded yet, try again shortly."
+            )
         else:
             messagebox.showerror("Error", f"Case ID {target_id} not found.")
     except ValueError:
         messagebox.showerror("Error", "Invalid Case ID.")
 
 
+@timed("open_files")
 def open_files():
     missing = []
-    case_id = case_ids[current_index]
+    case_id = store.case_ids[current_index]
     pdf_path = os.path.join(PDF_FOLDER, f"{case_id}.pdf")
     txt_path = os.path.join(TXT_FOLDER, f"{case_id}.txt")
-    if os.path.exists(pdf_path):
-        webbrowser.open(pdf_path)
+    if file_index.has_pdf(case_id):
+        open_in_viewer(pdf_path)
     else:
         missing.append("PDF")
-    if os.path.exists(txt_path):
-        webbrowser.open(txt_path)
+    if file_index.has_txt(case_id):
+        open_in_viewer(txt_path)
     else:
         missing.append("TXT")
     if missing:
@@ -196,6 +470,58 @@ def open_files():
             )
 
 
+def show_case_text(pager, case_id):
+    """Show the case's TXT file in the embedded pager, memory-mapped."""
+    if not file_index.has_txt(case_id):
+        pager.show(None, f"No TXT file for Case ID {case_id}.")
+        return
+    try:
+        pager.show(mapped_files.get(file_index.path(case_id, ".txt")))
+    except (OSError, ValueError) as e:
+        pager.show(None, f"Could not open the TXT file: {e}")
+
+
+def show_case_pdf(preview, case_id):
+    """Preview the case's PDF and start rendering the next case's first pages."""
+    if not renderer.available:
+        preview.show(None, "Install PyMuPDF (pip install pymupdf) for PDF previews.")
+        return
+    if file_index.has_pdf(case_id):
+        preview.show(file_index.path(case_id, ".pdf"))
+    else:
+        preview.show(None, f"No PDF file for Case ID {case_id}.")
+    if current_index + 1 < len(store):
+        next_id = store.case_ids[current_index + 1]
+        if file_index.has_pdf(next_id):
+            renderer.prefetch(file_index.path(next_id, ".pdf"))
+
+
+def open_in_viewer(path):
+    """webbrowser.open can block for seconds, so call it off the Tk thread."""
+    threading.Thread(target=webbrowser.open, args=(path,), daemon=True).start()
+
+
+def rebuild_checkboxes(checkbox_grid, checkbox_vars):
+    """Point the label grid at store.schema, e.g. after the full load.
+
+    checkbox_vars is updated in place since the UI callbacks hold it.
+    """
+    global loading_case
+    for label in list(checkbox_vars):
+        if label not in store.schema:
+            del checkbox_vars[label]
+    loading_case = True
+    for label, tick in zip(store.schema, store.labels[current_index].tolist()):
+        if label not in checkbox_vars:
+            var = tk.IntVar(master=checkbox_grid)
+            var.trace_add("write", mark_unsaved)
+            checkbox_vars[label] = var
+        checkbox_vars[label].set(tick)
+    loading_case = False
+    checkbox_grid.set_labels(store.schema.labels)
+    checkbox_grid.set_enabled(True)
+
+
 def mark_unsaved(*args):
     global unsaved_changes, loading_case
     if not loading_case:  # Only mark as unsaved if we're not loading a case
@@ -225,24 +551,48 @@ def check_unsaved(closing=False):
 
 def on_closing(root):
     if check_unsaved(closing=True):
+        remember_case()
+        compact_journal()
+        if finish_writes():
+            if store.cache_stale and storage_backend == "excel" and not store.loading:
+                # The workbook now matches memory; refresh the startup cache
+                write_cache(store.frame())
+        else:
+            messagebox.showwarning(
+                "Workbook Not Updated",
+                "The workbook could not be written. Your edits are kept in the "
+                "journal and will be restored next time the app starts.",
+            )
+        renderer.shutdown()
         root.destroy()
 
 
+@timed("update_progress")
 def update_progress(progress_bar, status_label):
-    done_count = (df["Case Done"] == 1).sum()
-    total = len(df)
+    if store.loading:
+        # The bar is spinning for the background load; the preview's counts
+        # would be misleading. poll_background_load calls this once done.
+        status_label.config(text=loading_text())
+        return
+    # Counters are kept up to date by the store, so this is O(1)
+    done_count = store.done_count
+    total = len(store)
     progress_bar["maximum"] = total
     progress_bar["value"] = done_count
-    status_label.config(text=f"Cases Done: {done_count} / {total}")
-
-    # Destroy existing tooltip if it exists
-    if hasattr(status_label, "_tooltip"):
-        status_label._tooltip.destroy()
-
-    # Create new tooltip
-    from tooltip import ToolTip
-
-    ToolTip(status_label, get_progress_message())
+    status = f"Cases Done: {done_count} / {total}"
+    missing = file_index.missing(store.case_ids)
+    if missing and (missing["pdf"] or missing["txt"]):
+        status += f"  |  Missing files: {missing['pdf']} PDF, {missing['txt']} TXT"
+    status_label.config(text=status)
+
+    # Reuse the label's tooltip and just refresh its text
+    tooltip = getattr(status_label, "_tooltip", None)
+    if tooltip is None:
+        from tooltip import ToolTip
+
+        status_label._tooltip = ToolTip(status_label, get_progress_message())
+    else:
+        tooltip.text = get_progress_message()
 
 
 def copy_case_id(case_label_var, root):
@@ -311,13 +661,17 @@ def open_settings(root, theme_combobox):
     ).grid(row=4, column=1, padx=5, pady=5)
 
     def save_settings():
-        new_config = {
-            "EXCEL_PATH": excel_path_var.get(),
-            "PDF_FOLDER": pdf_folder_var.get(),
-            "TXT_FOLDER": txt_folder_var.get(),
-            "unsaved_warning": unsaved_warning_var.get(),
-            "default_theme": theme_var.get(),
-        }
+        # Keep keys that the dialog does not edit (e.g. save_mode)
+        new_config = dict(load_config())
+        new_config.update(
+            {
+                "EXCEL_PATH": excel_path_var.get(),
+                "PDF_FOLDER": pdf_folder_var.get(),
+                "TXT_FOLDER": txt_folder_var.get(),
+                "unsaved_warning": unsaved_warning_var.get(),
+                "default_theme": theme_var.get(),
+            }
+        )
         # Save the new configuration to disk.
         save_config(new_config)
         # Reload the config so that global variables can be updated.
@@ -326,6 +680,7 @@ def open_settings(root, theme_combobox):
         EXCEL_PATH = cfg["EXCEL_PATH"]
         PDF_FOLDER = cfg["PDF_FOLDER"]
         TXT_FOLDER = cfg["TXT_FOLDER"]
+        file_index.set_folders(PDF_FOLDER, TXT_FOLDER)
         unsaved_warning = cfg["unsaved_warning"]
         default_theme = cfg["default_theme"]
         theme_combobox.set(default_theme)
@@ -341,8 +696,8 @@ def open_settings(root, theme_combobox):
 
 
 def get_progress_message():
-    done_count = (df["Case Done"] == 1).sum()
-    total = len(df)
+    done_count = store.done_count
+    total = len(store)
     percentage = (done_count / total) * 100 if total > 0 else 0
 
     if percentage == 0:
@@ -359,33 +714,12 @@ def get_progress_message():
         return "Congratulations! All cases are complete!"
 
 
+@timed("view_open_cases")
 def view_open_cases(case_label_var, notes_text, checkbox_vars, case_done_var):
     """Display a popup listing all case IDs separated into categories."""
     import tkinter as tk
     from tkinter import messagebox, ttk
 
-    # Filter cases by status
-    done_df = df[df["Case Done"] == 1]
-    not_done_df = df[df["Case Done"] != 1]
-
-    # Filter AI correct cases
-    ai_correct_df = df[df["Is AI Correct"] == 1]
-
-    # Filter done but incorrect cases (done but AI not correct)
-    done_incorrect_df = done_df[done_df["Is AI Correct"] != 1]
-
-    # Separate into unreviewed (completely empty) and open (started but not done)
-    checkbox_columns = [
-        col for col in df.columns if col not in ["Case ID", "Notes", "Case Done"]
-    ]
-
-    # Unreviewed cases have no checkboxes ticked and no notes
-    unreviewed_mask = (not_done_df[checkbox_columns] != 1).all(axis=1) & (
-        not_done_df["Notes"].isna() | (not_done_df["Notes"] == "")
-    )
-    unreviewed_df = not_done_df[unreviewed_mask]
-    open_df = not_done_df[~unreviewed_mask]
-
     # Create popup window
     window = tk.Toplevel()
     window.title("Case Status")
@@ -395,61 +729,52 @@ def view_open_cases(case_label_var, notes_text, checkbox_vars, case_done_var):
     notebook = ttk.Notebook(window)
     notebook.pack(fill="both", expand=True, padx=5, pady=5)
 
-    # Create tabs for all categories
-    def create_case_list(parent, cases_df, title):
-        frame = ttk.Frame(parent)
-        frame.pack(fill="both", expand=True)
+    def open_case(case_id):
+        case_idx = store.position_of(case_id)
+        if case_idx is not None:
+            load_case(
+                case_idx,
+                case_label_var,
+                notes_text,
+                checkbox_vars,
+                case_done_var,
+            )
+            window.destroy()
 
+    # Create tabs for all categories
+    def create_case_list(frame, case_list, title):
         # Add count label
-        count_label = ttk.Label(frame, text=f"Total {title}: {len(cases_df)}")
+        count_label = ttk.Label(frame, text=f"Total {title}: {len(case_list)}")
         count_label.pack(pady=(5, 0))
 
-        # Create listbox with scrollbar
-        listbox = tk.Listbox(frame, width=50)
-        listbox.pack(side="left", fill="both", expand=True)
-        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=listbox.yview)
-        scrollbar.pack(side="right", fill="y")
-        listbox.config(yscrollcommand=scrollbar.set)
-
-        # Populate listbox
-        for _, row in cases_df.iterrows():
-            case_id = int(row["Case ID"])
-            listbox.insert("end", case_id)
-
-        # Bind double-click event
-        def on_double_click(event):
-            selection = listbox.curselection()
-            if selection:
-                idx = selection[0]
-                selected_case_id = listbox.get(idx)
-                if selected_case_id in case_ids:
-                    case_idx = case_ids.index(selected_case_id)
-                    load_case(
-                        case_idx,
-                        case_label_var,
-                        notes_text,
-                        checkbox_vars,
-                        case_done_var,
-                    )
-                    window.destroy()
-
-        listbox.bind("<Double-Button-1>", on_double_click)
-        return frame
-
-    # Create and add tabs
-    unreviewed_tab = create_case_list(notebook, unreviewed_df, "Unreviewed")
-    open_tab = create_case_list(notebook, open_df, "Open")
-    done_tab = create_case_list(notebook, done_df, "Done")
-    ai_correct_tab = create_case_list(notebook, ai_correct_df, "AI Correct")
-    done_incorrect_tab = create_case_list(
-        notebook, done_incorrect_df, "Done but Incorrect"
-    )
-
-    notebook.add(unreviewed_tab, text=f"Unreviewed ({len(unreviewed_df)})")
-    notebook.add(open_tab, text=f"Open ({len(open_df)})")
-    notebook.add(done_tab, text=f"Done ({len(done_df)})")
-    notebook.add(ai_correct_tab, text=f"AI Correct ({len(ai_correct_df)})")
-    notebook.add(done_incorrect_tab, text=f"Done Incorrect ({len(done_incorrect_df)})")
+        # Only the visible rows are ever handed to Tk
+        case_listbox = VirtualListbox(frame, case_list, on_activate=open_case)
+        case_listbox.pack(fill="both", expand=True)
+
+    # Create and add tabs; each list is only built when its tab is first shown
+    tabs = [
+        ("unreviewed", "Unreviewed", "Unreviewed"),
+        ("open", "Open", "Open"),
+        ("done", "Done", "Done"),
+        ("ai_correct", "AI Correct", "AI Correct"),
+        ("done_incorrect", "Done but Incorrect", "Done Incorrect"),
+    ]
+    pending = {}
+    for name, title, tab_text in tabs:
+        # Categories are kept up to date by the store on every save
+        tab = ttk.Frame(notebook)
+        tab.pack(fill="both", expand=True)
+        notebook.add(tab, text=f"{tab_text} ({len(store.status[name])})")
+        pending[str(tab)] = (tab, name, title)
+
+    def on_tab_changed(event=None):
+        entry = pending.pop(notebook.select(), None)
+        if entry is not None:
+            tab, name, title = entry
+            create_case_list(tab, store.cases_in(name), title)
+
+    notebook.bind("<<NotebookTabChanged>>", on_tab_changed)
+    on_tab_changed()
 
 
 # Add this new function for toast notifications
@@ -0,0 +1,403 @@
+import base64
+import queue
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk
+
+
+class VirtualListbox(ttk.Frame):
+    """Scrollable list that only puts the rows currently on screen into Tk.
+
+    items stays a plain Python sequence; scrolling re-renders the visible
+    window, so the cost of drawing does not grow with len(items).
+    on_activate(item) is called on double-click or Enter.
+    """
+
+    def __init__(self, master, items, on_activate=None, width=50, **kwargs):
+        super().__init__(master, **kwargs)
+        self.items = items
+        self.on_activate = on_activate
+        self.top = 0
+        self.visible = 20
+        self.selected = None
+
+        self.listbox = tk.Listbox(
+            self, width=width, height=self.visible, exportselection=False
+        )
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.listbox.bind("<Configure>", self.on_resize)
+        self.listbox.bind("<MouseWheel>", self.on_mousewheel)
+        self.listbox.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.listbox.bind("<Button-5>", lambda event: self.scroll(3))
+        self.listbox.bind("<<ListboxSelect>>", self.on_select)
+        self.listbox.bind("<Double-Button-1>", lambda event: self.activate())
+        self.listbox.bind("<Return>", lambda event: self.activate())
+        self.listbox.bind("<Up>", lambda event: self.move_selection(-1))
+        self.listbox.bind("<Down>", lambda event: self.move_selection(1))
+        self.listbox.bind("<Prior>", lambda event: self.scroll(-self.visible))
+        self.listbox.bind("<Next>", lambda event: self.scroll(self.visible))
+        self.render()
+
+    def set_labels(self, labels):
+        """Show a different list of labels; variables must cover them."""
+        self.labels = labels
+        self.render()
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        self.render()
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, what)."""
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.items))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self.visible
+            self.top += amount
+        self.render()
+
+    def scroll(self, rows):
+        self.top += rows
+        self.render()
+        return "break"
+
+    def render(self):
+        count = len(self.items)
+        self.top = max(0, min(self.top, count - self.visible))
+        window = self.items[self.top : self.top + self.visible]
+        self.listbox.delete(0, "end")
+        if window:
+            self.listbox.insert("end", *window)
+        if self.selected is not None and 0 <= self.selected - self.top < len(window):
+            self.listbox.selection_set(self.selected - self.top)
+        if count:
+            self.scrollbar.set(self.top / count, (self.top + len(window)) / count)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def on_resize(self, event):
+        linespace = tkfont.Font(font=self.listbox.cget("font")).metrics("linespace")
+        visible = max(1, event.height // (linespace + 1))
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+    def on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def on_select(self, event):
+        selection = self.listbox.curselection()
+        if selection:
+            self.selected = self.top + selection[0]
+
+    def move_selection(self, step):
+        if not self.items:
+            return "break"
+        if self.selected is None:
+            self.selected = self.top
+        else:
+            self.selected = max(0, min(len(self.items) - 1, self.selected + step))
+        # Keep the selected row inside the rendered window
+        if self.selected < self.top:
+            self.top = self.selected
+        elif self.selected >= self.top + self.visible:
+            self.top = self.selected - self.visible + 1
+        self.render()
+        return "break"
+
+    def activate(self):
+        if self.selected is not None and self.on_activate is not None:
+            self.on_activate(self.items[self.selected])
+
+
+class VirtualCheckboxGrid(ttk.Frame):
+    """Label checkboxes laid out num_columns wide, scrolled a row at a time.
+
+    Only one screenful of Checkbuttons exists; scrolling re-points the
+    pooled widgets at other labels' variables. variables maps each label to
+    its IntVar and stays the source of truth, so ticks survive scrolling and
+    code reading the variables never needs to know what is on screen.
+    """
+
+    def __init__(self, master, labels, variables, num_columns=4, height=150, **kw):
+        super().__init__(master, height=height, **kw)
+        self.labels = labels
+        self.variables = variables
+        self.num_columns = num_columns
+        self.top = 0  # first grid row on screen
+        self.visible = 1
+        self.row_height = 30
+        self.pool = []  # one list of Checkbuttons per visible grid row
+        self.enabled = True
+
+        self.pack_propagate(False)
+        self.body = ttk.Frame(self)
+        self.body.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        for col in range(num_columns):
+            self.body.columnconfigure(col, weight=1, uniform="checkbox_col")
+
+        self.body.bind("<Configure>", self.on_resize)
+        for widget in (self, self.body):
+            self.bind_scroll(widget)
+        self.set_height(height)
+
+    @property
+    def row_count(self):
+        return -(-len(self.labels) // self.num_columns)
+
+    def bind_scroll(self, widget):
+        widget.bind("<MouseWheel>", self.on_mousewheel)
+        widget.bind("<Button-4>", lambda event: self.scroll(-1))
+        widget.bind("<Button-5>", lambda event: self.scroll(1))
+
+    def set_height(self, height):
+        self.configure(height=height)
+        self.resize_pool(max(1, height // self.row_height))
+
+    def resize_pool(self, visible):
+        """Grow or shrink the widget pool to visible grid rows."""
+        self.visible = visible
+        while len(self.pool) < visible:
+            row = len(self.pool)
+            widgets = []
+            for col in range(self.num_columns):
+                cb = ttk.Checkbutton(self.body)
+                cb.grid(row=row, column=col, sticky="w", padx=15, pady=4)
+                self.bind_scroll(cb)
+                widgets.append(cb)
+            self.pool.append(widgets)
+        while len(self.pool) > visible:
+            for cb in self.pool.pop():
+                cb.destroy()
+        self.render()
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, what)."""
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * self.row_count)
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self.visible
+            self.top += amount
+        self.render()
+
+    def scroll(self, rows):
+        self.top += rows
+        self.render()
+        return "break"
+
+    def render(self):
+        count = self.row_count
+        self.top = max(0, min(self.top, count - self.visible))
+        for offset, widgets in enumerate(self.pool):
+            first = (self.top + offset) * self.num_columns
+            for col, cb in enumerate(widgets):
+                i = first + col
+                if i < len(self.labels):
+                    label = self.labels[i]
+                    cb.configure(text=label, variable=self.variables[label])
+                    cb.state(["!disabled" if self.enabled else "disabled"])
+                    cb.grid()
+                else:
+                    cb.grid_remove()
+        if count:
+            shown = min(self.visible, count - self.top)
+            self.scrollbar.set(self.top / count, (self.top + shown) / count)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def on_resize(self, event):
+        # Measure a real row once widgets exist so the pool fits the height
+        if self.pool and self.pool[0][0].winfo_height() > 1:
+            self.row_height = self.pool[0][0].winfo_height() + 8
+        visible = max(1, event.height // self.row_height)
+        if visible != self.visible:
+            self.resize_pool(visible)
+
+    def on_mousewheel(self, event):
+        return self.scroll(-1 if event.delta > 0 else 1)
+
+
+class TextPager(ttk.Frame):
+    """Read-only view of a MappedText that only decodes the lines on screen.
+
+    The scrollbar tracks byte offsets, so jumping anywhere in a huge file
+    costs the same as showing its first page.
+    """
+
+    def __init__(self, master, width=60, height=15, **kwargs):
+        super().__init__(master, **kwargs)
+        self.source = None
+        self.top = 0  # byte offset of the first line on screen
+        self.visible = height
+
+        self.text = tk.Text(self, wrap="none", width=width, height=height)
+        self.text.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.text.configure(state="disabled")
+
+        self.text.bind("<Configure>", self.on_resize)
+        self.text.bind("<MouseWheel>", self.on_mousewheel)
+        self.text.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.text.bind("<Button-5>", lambda event: self.scroll(3))
+        self.text.bind("<Prior>", lambda event: self.scroll(-self.visible))
+        self.text.bind("<Next>", lambda event: self.scroll(self.visible))
+
+    def show(self, source, message=""):
+        """Display source (a MappedText), or message when it is None."""
+        self.source = source
+        self.top = 0
+        if source is None:
+            self.set_text(message)
+            self.scrollbar.set(0, 1)
+        else:
+            self.render()
+
+    def set_text(self, text):
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("end", text)
+        self.text.configure(state="disabled")
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, what)."""
+        if self.source is None:
+            return
+        if args[0] == "moveto":
+            offset = int(float(args[1]) * self.source.size)
+            # Dragging to the very end shows the last line, not an empty page
+            self.top = self.source.line_start(min(offset, self.source.size - 1))
+            self.render()
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self.visible
+            self.scroll(amount)
+
+    def scroll(self, lines):
+        if self.source is None:
+            return "break"
+        step = self.source.next_line if lines > 0 else self.source.previous_line
+        for _ in range(abs(lines)):
+            offset = step(self.top)
+            if lines > 0 and offset >= self.source.size:
+                break
+            self.top = offset
+        self.render()
+        return "break"
+
+    def render(self):
+        text, end = self.source.read_lines(self.top, self.visible)
+        self.set_text(text)
+        if self.source.size:
+            self.scrollbar.set(self.top / self.source.size, end / self.source.size)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def on_resize(self, event):
+        linespace = tkfont.Font(font=self.text.cget("font")).metrics("linespace")
+        visible = max(1, event.height // linespace)
+        if visible != self.visible:
+            self.visible = visible
+            if self.source is not None:
+                self.render()
+
+    def on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+
+class PdfPreview(ttk.Frame):
+    """Page-by-page PDF preview fed by a PdfRenderer.
+
+    Pages are rendered off the Tk thread; the widget polls the renderer's
+    results and ignores any that belong to a file or page no longer shown.
+    """
+
+    def __init__(self, master, renderer, **kwargs):
+        super().__init__(master, **kwargs)
+        self.renderer = renderer
+        self.path = None
+        self.page = 0
+        self.page_count = 0
+        self.photo = None
+
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill="x")
+        self.prev_button = ttk.Button(
+            toolbar, text="< Page", command=lambda: self.go(-1)
+        )
+        self.prev_button.pack(side="left")
+        self.page_var = tk.StringVar()
+        ttk.Label(toolbar, textvariable=self.page_var).pack(side="left", padx=10)
+        self.next_button = ttk.Button(
+            toolbar, text="Page >", command=lambda: self.go(1)
+        )
+        self.next_button.pack(side="left")
+        self.image_label = ttk.Label(self, anchor="center")
+        self.image_label.pack(fill="both", expand=True, pady=(5, 0))
+        self.poll()
+
+    def show(self, path, message=""):
+        """Preview the first page of path, or show message when path is None."""
+        self.path = path
+        self.page = 0
+        self.page_count = 0
+        if path is None:
+            self.set_message(message)
+        else:
+            self.request()
+
+    def go(self, step):
+        if self.path is None:
+            return
+        page = self.page + step
+        if 0 <= page < max(self.page_count, 1):
+            self.page = page
+            self.request()
+
+    def request(self):
+        self.set_message("Rendering...")
+        self.renderer.request(self.path, self.page)
+        # Warm the page the reader is most likely to turn to next
+        self.renderer.prefetch(self.path, (self.page + 1,))
+
+    def set_message(self, message):
+        self.photo = None
+        self.image_label.configure(image="", text=message)
+        self.update_page_label()
+
+    def update_page_label(self):
+        if self.page_count:
+            self.page_var.set(f"Page {self.page + 1} / {self.page_count}")
+        else:
+            self.page_var.set("")
+
+    def poll(self):
+        while True:
+            try:
+                _, path, page, png, page_count, error = (
+                    self.renderer.results.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if path != self.path or page != self.page:
+                continue  # the reader has moved on
+            self.page_count = page_count
+            if error is not None:
+                self.set_message(f"Could not render the PDF: {error}")
+            elif png is None:
+                self.set_message("The PDF has no pages.")
+            else:
+                self.photo = tk.PhotoImage(data=base64.b64encode(png))
+                self.image_label.configure(image=self.photo, text="")
+                self.update_page_label()
+        self.after(50, self.poll)
@@ -0,0 +1,125 @@
+import queue
+import threading
+
+import journal
+from data import export_excel, save_dataframe, save_rows
+
+
+class BackgroundWriter:
+    """Single thread that writes the workbook so the Tk loop never blocks.
+
+    Row snapshots submitted while a write is pending are merged into one
+    write (newer snapshots of a row replace older ones). Outcomes are put on
+    results as (status, message, positions) tuples for the UI to poll:
+    "saved", "exported", "failed", or "full_needed" when the rows cannot be
+    patched and the caller should submit a full frame instead.
+    """
+
+    def __init__(self, delay=0.25):
+        self.delay = delay  # seconds to wait for more saves to coalesce
+        self.results = queue.Queue()
+        self._cond = threading.Condition()
+        self._rows = {}
+        self._frame = None
+        self._export = None
+        self._journal_seq = 0
+        self._busy = False
+        self._flushing = False
+        self._thread = None
+
+    def submit_rows(self, rows, journal_seq):
+        """Queue {position: {column: value}} snapshots for a delta save."""
+        with self._cond:
+            self._rows.update(rows)
+            self._journal_seq = max(self._journal_seq, journal_seq)
+            self._wake()
+
+    def submit_frame(self, df, journal_seq):
+        """Queue a full rewrite from a DataFrame copy owned by the writer."""
+        with self._cond:
+            # The copy was taken after every queued row snapshot
+            self._frame = df
+            self._rows = {}
+            self._journal_seq = max(self._journal_seq, journal_seq)
+            self._wake()
+
+    def submit_export(self, df):
+        """Queue an export of a DataFrame copy to the Excel workbook."""
+        with self._cond:
+            self._export = df
+            self._wake()
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is written; False on timeout."""
+        with self._cond:
+            self._flushing = True
+            self._cond.notify_all()
+            done = self._cond.wait_for(self._idle, timeout)
+            self._flushing = False
+        return done
+
+    def _idle(self):
+        return not (
+            self._busy
+            or self._rows
+            or self._frame is not None
+            or self._export is not None
+        )
+
+    def _wake(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="workbook-writer", daemon=True
+            )
+            self._thread.start()
+        self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: not self._idle())
+                # Give rapid successive saves a moment to pile up
+                self._cond.wait_for(lambda: self._flushing, self.delay)
+                frame, rows, seq = self._frame, self._rows, self._journal_seq
+                export = self._export
+                self._frame, self._rows, self._export = None, {}, None
+                self._busy = True
+            try:
+                if frame is not None or rows:
+                    self._write(frame, rows, seq)
+                if export is not None:
+                    self._write_export(export)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _write(self, frame, rows, seq):
+        positions = sorted(rows)
+        try:
+            if frame is not None:
+                save_dataframe(frame)
+            if rows:
+                save_rows(rows)
+            journal.truncate_through(seq)
+        except (KeyError, ValueError) as e:
+            if frame is None:
+                self.results.put(("full_needed", str(e), positions))
+            else:
+                self.results.put(("failed", str(e), positions))
+        except Exception as e:
+            self.results.put(("failed", str(e), positions))
+        else:
+            count = len(frame) if frame is not None else len(rows)
+            self.results.put(("saved", f"Workbook updated ({count} rows).", positions))
+
+    def _write_export(self, df):
+        try:
+            export_excel(df)
+        except Exception as e:
+            self.results.put(("failed", f"Export failed: {e}", []))
+        else:
+            self.results.put(("exported", f"Exported {len(df)} rows to Excel.", []))
+
+
+writer = BackgroundWriter()
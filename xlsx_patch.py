@@ -0,0 +1,231 @@
+import math
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+import zipfile
+from xml.sax.saxutils import escape
+
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+CELL_RE = re.compile(rb"<c\b[^>]*?(?:/>|>.*?</c>)", re.DOTALL)
+CELL_REF_RE = re.compile(rb'\br="([A-Z]+)\d+"')
+CELL_STYLE_RE = re.compile(rb'\bs="(\d+)"')
+ROW_NUMBER_RE = re.compile(rb'<row\b[^>]*?\br="(\d+)"')
+
+
+def column_number(letters):
+    """Convert an Excel column letter to its 1-based number (A -> 1)."""
+    number = 0
+    for ch in letters:
+        number = number * 26 + ord(ch) - 64
+    return number
+
+
+def first_sheet_path(zf):
+    """Return the zip member name of the first worksheet in the workbook."""
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    sheet = workbook.find(f"{{{MAIN_NS}}}sheets/{{{MAIN_NS}}}sheet")
+    rel_id = sheet.get(f"{{{REL_NS}}}id")
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels.iter(f"{{{PKG_REL_NS}}}Relationship"):
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target")
+            if target.startswith("/"):
+                return target.lstrip("/")
+            return posixpath.normpath(posixpath.join("xl", target))
+    raise ValueError("Workbook has no worksheet relationship for its first sheet.")
+
+
+def shared_strings(zf, needed):
+    """Read shared strings up to the highest index in needed."""
+    if "xl/sharedStrings.xml" not in zf.namelist() or not needed:
+        return []
+    last = max(needed)
+    strings = []
+    with zf.open("xl/sharedStrings.xml") as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag == f"{{{MAIN_NS}}}si":
+                strings.append(
+                    "".join(t.text or "" for t in elem.iter(f"{{{MAIN_NS}}}t"))
+                )
+                elem.clear()
+                if len(strings) > last:
+                    break
+    return strings
+
+
+def find_row(xml, row_number):
+    """Return (start, end) of the <row> element for row_number, or None."""
+    start = xml.find(b'<row r="%d"' % row_number)
+    if start < 0:
+        # Writers are free to put other attributes before r=""
+        for match in ROW_NUMBER_RE.finditer(xml):
+            if int(match.group(1)) == row_number:
+                start = match.start()
+                break
+        else:
+            return None
+    open_end = xml.index(b">", start)
+    if xml[open_end - 1 : open_end] == b"/":
+        return start, open_end + 1
+    return start, xml.index(b"</row>", open_end) + len(b"</row>")
+
+
+def read_header(zf, xml):
+    """Map header names in row 1 to their column letters."""
+    span = find_row(xml, 1)
+    if span is None:
+        raise ValueError("Worksheet has no header row.")
+    # The row is parsed on its own, so re-declare the sheet's default namespace
+    row_xml = xml[span[0] : span[1]].replace(
+        b"<row", b'<row xmlns="%s"' % MAIN_NS.encode(), 1
+    )
+    row = ET.fromstring(row_xml)
+    cells = []
+    needed = []
+    for cell in row.iter(f"{{{MAIN_NS}}}c"):
+        kind = cell.get("t")
+        if kind == "s":
+            value = int(cell.find(f"{{{MAIN_NS}}}v").text)
+            needed.append(value)
+        elif kind == "inlineStr":
+            value = "".join(t.text or "" for t in cell.iter(f"{{{MAIN_NS}}}t"))
+        else:
+            v = cell.find(f"{{{MAIN_NS}}}v")
+            value = v.text if v is not None else None
+        cells.append((re.match(r"[A-Z]+", cell.get("r")).group(0), kind, value))
+    strings = shared_strings(zf, needed)
+    header = {}
+    for letters, kind, value in cells:
+        name = strings[value] if kind == "s" else value
+        if name is not None:
+            header[name] = letters
+    return header
+
+
+def cell_xml(ref, value, style=None):
+    """Serialise one cell; returns b"" for blank values."""
+    if hasattr(value, "item"):
+        value = value.item()  # numpy scalar
+    if (
+        value is None
+        or (isinstance(value, str) and value == "")
+        or (isinstance(value, float) and math.isnan(value))
+        or type(value).__name__ in ("NAType", "NaTType")
+    ):
+        return b""
+    style_attr = f' s="{style.decode()}"' if style else ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}"{style_attr} t="b"><v>{int(value)}</v></c>'.encode()
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"{style_attr}><v>{value!r}</v></c>'.encode()
+    # Control characters (e.g. form feeds pasted from a PDF) are not allowed
+    # in XML at all, so drop them rather than write an unreadable sheet
+    text = escape(ILLEGAL_CHARACTERS_RE.sub("", str(value)))
+    return (
+        f'<c r="{ref}"{style_attr} t="inlineStr">'
+        f'<is><t xml:space="preserve">{text}</t></is></c>'
+    ).encode("utf-8")
+
+
+def patch_row(row_xml, row_number, updates):
+    """Rewrite the cells named in updates (letters -> value) inside one <row>."""
+    open_end = row_xml.index(b">") + 1
+    if row_xml.endswith(b"/>"):
+        start_tag = row_xml[:-2] + b">"
+        body = b""
+    else:
+        start_tag = row_xml[:open_end]
+        body = row_xml[open_end : -len(b"</row>")]
+
+    cells = {}
+    for match in CELL_RE.finditer(body):
+        cell = match.group(0)
+        letters = CELL_REF_RE.search(cell).group(1).decode()
+        cells[letters] = cell
+
+    for letters, value in updates.items():
+        old = cells.get(letters)
+        style = None
+        if old is not None:
+            found = CELL_STYLE_RE.search(old.split(b">", 1)[0])
+            style = found.group(1) if found else None
+        cells[letters] = cell_xml(f"{letters}{row_number}", value, style)
+
+    ordered = sorted(cells.items(), key=lambda item: column_number(item[0]))
+    return start_tag + b"".join(cell for _, cell in ordered) + b"</row>"
+
+
+def new_row(row_number, updates):
+    return patch_row(b'<row r="%d"/>' % row_number, row_number, updates)
+
+
+def patch_rows(path, rows):
+    """Patch cell values of individual rows of the first sheet in an .xlsx.
+
+    rows maps a 0-based data row position (row 0 is the first row below the
+    header) to a {column name: value} dict. Only the named cells of those rows
+    are rewritten; every other part of the workbook is copied unchanged. The
+    result is written to a temporary file and moved over path, so a crash
+    never leaves a half-written workbook behind.
+
+    Raises KeyError if a column is not present in the header row and
+    ValueError if the file cannot be patched in place.
+    """
+    try:
+        zf = zipfile.ZipFile(path)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"{path} is not a readable .xlsx workbook.") from e
+    with zf:
+        sheet_name = first_sheet_path(zf)
+        xml = zf.read(sheet_name)
+        header = read_header(zf, xml)
+
+        for pos in sorted(rows):
+            row_number = pos + 2
+            updates = {}
+            for col, value in rows[pos].items():
+                letters = header.get(col, header.get(str(col)))
+                if letters is None:
+                    raise KeyError(col)
+                updates[letters] = value
+            span = find_row(xml, row_number)
+            if span is None:
+                span = insertion_point(xml, row_number)
+                replacement = new_row(row_number, updates)
+            else:
+                replacement = patch_row(xml[span[0] : span[1]], row_number, updates)
+            xml = xml[: span[0]] + replacement + xml[span[1] :]
+
+        fd, tmp_path = tempfile.mkstemp(
+            suffix=".xlsx", dir=os.path.dirname(os.path.abspath(path))
+        )
+        try:
+            with os.fdopen(fd, "wb") as f, zipfile.ZipFile(
+                f, "w", zipfile.ZIP_DEFLATED
+            ) as out:
+                for info in zf.infolist():
+                    data = xml if info.filename == sheet_name else zf.read(info)
+                    out.writestr(info, data, compress_type=zipfile.ZIP_DEFLATED)
+            shutil.copymode(path, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def insertion_point(xml, row_number):
+    """Empty (start, end) span where a missing row should be inserted."""
+    for match in ROW_NUMBER_RE.finditer(xml):
+        if int(match.group(1)) > row_number:
+            return match.start(), match.start()
+    end = xml.index(b"</sheetData>")
+    return end, end